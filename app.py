@@ -1,22 +1,20 @@
 import streamlit as st
 import pandas as pd
-from core import (
-    merge_personnel_files,
-    process_vehicle_attendance,
-    process_task_progress,
-    merge_vehicle_with_tasks,
-)
+from core import TASK_PIPELINE_STAGES, run_task_pipeline
+from core.job_runner import job_runner
 from components import (
     setup_page,
     create_sidebar_navigation,
     create_header,
     create_info_box,
     create_simple_metric,
+    wait_for_job,
 )
 from core.data_services import (
     DataProcessingService,
     FilterService,
     DataValidationService,
+    TaskCubeService,
 )
 from core.chart_generators import (
     TaskTrendChartGenerator,
@@ -32,6 +30,15 @@ from components.ui_components import (
 )
 
 
+def process_data_job(personnel_file, employee_file, vehicle_file, task_file, progress):
+    """后台任务：执行工单分析流程并构建聚合立方体"""
+    final_df, task_df = run_task_pipeline(
+        personnel_file, employee_file, vehicle_file, task_file, progress=progress
+    )
+    progress("构建聚合立方体")
+    return final_df, task_df, TaskCubeService.build_cube(task_df)
+
+
 def setup_data_processing_tab():
     """设置数据处理标签页"""
     st.markdown("### 📁 数据文件配置")
@@ -61,32 +68,46 @@ def setup_data_processing_tab():
         if not FileUploadComponents.validate_uploaded_files(uploaded_files):
             return
 
-        with st.spinner("正在处理数据，请稍候..."):
-            try:
-                # 处理数据
-                personnel_df = merge_personnel_files(
-                    uploaded_files["personnel"], uploaded_files["employee"]
-                )
-                vehicle_df = process_vehicle_attendance(
-                    uploaded_files["vehicle"], personnel_df
-                )
-                task_df = process_task_progress(
-                    uploaded_files["task"], uploaded_files["employee"]
-                )
-                final_df = merge_vehicle_with_tasks(vehicle_df, task_df)
-
-                # 保存到session state
-                st.session_state.processed_data = final_df
-                st.session_state.task_data = task_df
-                st.session_state.processing_success = True
-
-                create_info_box(
-                    f"数据处理完成！共处理 {len(final_df)} 条记录。", "success"
-                )
-
-            except Exception as e:
-                st.session_state.processing_success = False
-                create_info_box(f"数据处理失败: {str(e)}", "error")
+        # 读取文件内容后提交到后台任务（四个文件并行解析），页面重新运行不会中断处理
+        job = job_runner.submit(
+            process_data_job,
+            TASK_PIPELINE_STAGES + ["构建聚合立方体"],
+            *(
+                uploaded_files[kind].getvalue()
+                for kind in ["personnel", "employee", "vehicle", "task"]
+            ),
+        )
+        st.session_state.processing_job_id = job.id
+
+    # 显示后台任务进度，结束后保存结果
+    job_id = st.session_state.get("processing_job_id")
+    job = job_runner.get(job_id) if job_id else None
+    if job is not None:
+        wait_for_job(job)
+        # 结果已由本会话取回，不再由任务执行器保留
+        job_runner.pop(job.id)
+        st.session_state.processing_job_id = None
+
+        if job.error is not None:
+            st.session_state.processing_success = False
+            create_info_box(f"数据处理失败: {str(job.error)}", "error")
+        else:
+            final_df, task_df, task_cube = job.result
+
+            # 保存到session state
+            st.session_state.processed_data = final_df
+            st.session_state.task_data = task_df
+            # 预聚合立方体，可视化分析的统计均在立方体上完成
+            st.session_state.task_cube = task_cube
+            st.session_state.processing_success = True
+
+            match_stats = final_df.attrs.get("task_match_stats", {})
+            create_info_box(
+                f"数据处理完成！共处理 {len(final_df)} 条记录，"
+                f"匹配工单 {match_stats.get('matched', 0)} 条，"
+                f"未匹配 {match_stats.get('unmatched', 0)} 条。",
+                "success",
+            )
 
     # 显示处理结果
     if st.session_state.processed_data is not None:
@@ -102,11 +123,12 @@ def setup_visualization_tab():
         )
         return
 
-    df = st.session_state.task_data
-
-    # 转换为日期类型
-    if "日期" in df.columns:
-        df["日期"] = pd.to_datetime(df["日期"], errors="coerce")
+    # 聚合立方体（日期已转换为日期类型）；旧会话中不存在时补建
+    if st.session_state.get("task_cube") is None:
+        st.session_state.task_cube = TaskCubeService.build_cube(
+            st.session_state.task_data
+        )
+    df = st.session_state.task_cube
 
     LayoutComponents.create_section_header("数据分析面板", "车辆出勤与工单履行率分析")
 
@@ -0,0 +1,3 @@
+"""
+性能测试包 - 模拟数据生成与数据处理流程性能测试
+"""
@@ -0,0 +1,207 @@
+"""生成用于性能测试的模拟数据
+
+按指定行数生成人员明细、IResource员工、车辆出勤记录和工单履行率明细四份数据，
+列结构与 config.FILE_SCHEMAS 一致；可直接在内存中使用，也可写出为Excel文件。
+
+用法：
+    python -m benchmarks.data_generator --rows 100000 --output bench_data/100k
+"""
+
+import argparse
+import os
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+# 省 -> 市
+REGIONS = {
+    "广东": ["广州", "深圳", "佛山", "东莞", "珠海", "汕头", "惠州", "中山"],
+    "广西": ["南宁", "柳州", "桂林", "梧州", "北海"],
+    "湖南": ["长沙", "株洲", "湘潭", "衡阳", "岳阳", "常德"],
+    "江西": ["南昌", "赣州", "九江", "上饶"],
+    "福建": ["福州", "厦门", "泉州", "漳州", "莆田"],
+    "海南": ["海口", "三亚"],
+}
+
+# 工单任务状态及出现比例（含少量未在映射表中的状态）
+TASK_STATUSES = {
+    "已完成": 0.30,
+    "审核通过": 0.15,
+    "已关闭": 0.05,
+    "第三方上传完成": 0.10,
+    "分析失败": 0.03,
+    "评审中": 0.04,
+    "执行中": 0.12,
+    "待执行": 0.08,
+    "已指派": 0.05,
+    "测试中": 0.05,
+    "挂起": 0.03,
+}
+
+# 每份数据在Excel中的标题行数（与 FILE_SCHEMAS 的 header 一致）
+TITLE_ROWS = {"personnel": 1, "employee": 0, "vehicle": 1, "task": 0}
+
+
+def generate_datasets(
+    rows: int, seed: int = 0, days: int = 180, start_date: str = "2024-01-01"
+) -> Dict[str, pd.DataFrame]:
+    """生成四份输入数据，车辆出勤记录和工单明细各约rows行
+
+    人员数量随行数增长（约每20行一人），每人固定归属一个地市；
+    约5%的出勤记录和工单无法关联到人员，用于覆盖未匹配的分支。
+    """
+    rng = np.random.default_rng(seed)
+    people = max(50, rows // 20)
+
+    # 地市表及每人归属的地市
+    provinces = np.array([p for p, cities in REGIONS.items() for _ in cities])
+    cities = np.array([c for cities in REGIONS.values() for c in cities])
+    home = rng.integers(0, len(cities), people)
+
+    uids = np.char.add("U", np.char.zfill(np.arange(people).astype(str), 7))
+    accounts = np.char.add("w", np.char.zfill(np.arange(people).astype(str), 7))
+    names = np.char.add("员工", np.arange(people).astype(str))
+    id_numbers = np.char.add(
+        "4401", np.char.zfill(rng.permutation(people).astype(str), 14)
+    )
+
+    personnel = pd.DataFrame(
+        {
+            "u_uid": uids,
+            "员工编号": np.arange(100000, 100000 + people),
+            "员工姓名": names,
+            "身份证号": id_numbers,
+            "部门": rng.choice(["交付一部", "交付二部", "运维部"], people),
+        }
+    )
+    # 人员明细中存在少量重复行
+    personnel = pd.concat(
+        [personnel, personnel.sample(frac=0.02, random_state=seed)], ignore_index=True
+    )
+
+    # IResource中约90%的人员有账号
+    covered = rng.random(people) < 0.9
+    employee = pd.DataFrame(
+        {
+            "*资源姓名": names[covered],
+            "Uniportal账号": accounts[covered],
+            "*ID编码": id_numbers[covered],
+            "所属部门": "交付中心",
+        }
+    )
+
+    start = pd.Timestamp(start_date)
+    day_offsets = pd.to_timedelta(rng.integers(0, days, rows), unit="D")
+
+    # 车辆出勤记录
+    uploader = rng.integers(0, people, rows)
+    uploader_ids = uids[uploader].astype(object)
+    uploader_ids[rng.random(rows) < 0.05] = "U_UNKNOWN"
+    dates = start + day_offsets
+    start_times = dates + pd.to_timedelta(
+        rng.normal(8.8 * 3600, 1800, rows).astype(np.int64), unit="s"
+    )
+    end_times = start_times + pd.to_timedelta(
+        rng.normal(9.5 * 3600, 2 * 3600, rows).clip(3600).astype(np.int64), unit="s"
+    )
+    start_mileage = rng.integers(10000, 200000, rows)
+    mileage = rng.gamma(2.0, 70.0, rows).round(1)
+    toll_fee = rng.choice([0, 0, 0, 15, 35, 60, 120, 180], rows)
+    parking_fee = rng.choice([0, 0, 5, 10, 20], rows)
+    overtime_fee = rng.choice([0, 0, 0, 10, 20, 30], rows)
+    clock_only = (rng.random(rows) < 0.03).astype(int)
+    plates = np.char.add(
+        "粤B", np.char.zfill(rng.integers(0, people, rows).astype(str), 5)
+    )
+
+    vehicle = pd.DataFrame(
+        {
+            "日期": dates,
+            "车牌号码": plates,
+            "驾驶员名称": np.char.add(
+                "司机", rng.integers(0, people, rows).astype(str)
+            ),
+            "路桥费": toll_fee,
+            "停车费": parking_fee,
+            "加班费": overtime_fee,
+            "开始时间": start_times,
+            "结束时间": end_times,
+            "行驶里程": mileage,
+            "开始公里数": start_mileage,
+            "结束公里数": start_mileage + mileage,
+            "小计": (toll_fee + parking_fee + overtime_fee) * (1 - clock_only),
+            "上传人id": uploader_ids,
+            "上传人姓名": names[uploader],
+            "供应商名称": rng.choice(["供应商A", "供应商B", "供应商C"], rows),
+            "省": provinces[home[uploader]],
+            "市": cities[home[uploader]],
+            "一级项目名称": rng.choice(["网络优化", "工程交付"], rows),
+            "二级项目名称": rng.choice(["路测", "巡检", "开通", "整改"], rows),
+            "只打卡不出车": clock_only,
+            "备注": "",
+        }
+    )
+
+    # 工单履行率明细
+    owner = rng.integers(0, people, rows)
+    owner_accounts = accounts[owner].astype(object)
+    owner_accounts[rng.random(rows) < 0.05] = "w_unknown"
+    statuses = list(TASK_STATUSES)
+    weights = np.array(list(TASK_STATUSES.values()))
+
+    task = pd.DataFrame(
+        {
+            "工单编号": np.char.add("WO", np.arange(rows).astype(str)),
+            "工单类别": rng.choice(["前台工单", "后台工单"], rows, p=[0.85, 0.15]),
+            "工单日期": start + pd.to_timedelta(rng.integers(0, days, rows), unit="D"),
+            "省份": provinces[home[owner]],
+            "地市": cities[home[owner]],
+            "责任人账号": owner_accounts,
+            "责任人姓名": names[owner],
+            "任务状态": rng.choice(statuses, rows, p=weights / weights.sum()),
+        }
+    )
+
+    return {
+        "personnel": personnel,
+        "employee": employee,
+        "vehicle": vehicle,
+        "task": task,
+    }
+
+
+def write_workbooks(
+    datasets: Dict[str, pd.DataFrame], output_dir: str
+) -> Dict[str, str]:
+    """将数据写出为Excel文件（带标题行的文件先写一行标题），返回 {文件类型: 路径}"""
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {}
+    for kind, df in datasets.items():
+        path = os.path.join(output_dir, f"{kind}.xlsx")
+        title_rows = TITLE_ROWS.get(kind, 0)
+        with pd.ExcelWriter(path) as writer:
+            if title_rows:
+                pd.DataFrame([[f"{kind} 模拟数据"]]).to_excel(
+                    writer, index=False, header=False
+                )
+            df.to_excel(writer, index=False, startrow=title_rows)
+        paths[kind] = path
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成性能测试用的模拟数据")
+    parser.add_argument("--rows", type=int, default=10000, help="出勤记录和工单行数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--days", type=int, default=180, help="日期跨度（天）")
+    parser.add_argument("--output", required=True, help="Excel文件输出目录")
+    args = parser.parse_args()
+
+    datasets = generate_datasets(args.rows, seed=args.seed, days=args.days)
+    for kind, path in write_workbooks(datasets, args.output).items():
+        print(f"{kind}: {path} ({len(datasets[kind])} 行)")
+
+
+if __name__ == "__main__":
+    main()
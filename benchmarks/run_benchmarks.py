@@ -0,0 +1,319 @@
+"""数据处理流程性能测试
+
+对每个数据规模生成模拟数据，依次执行工单分析流程、车辆数据核查和看板聚合的各个阶段，
+记录每个阶段的耗时（多次运行取最小值）和峰值内存（tracemalloc，单独运行一次），
+结果写入JSON文件，可与其他版本的结果对比。
+
+用法：
+    python -m benchmarks.run_benchmarks --sizes 10000 100000 1000000
+    python -m benchmarks.run_benchmarks --sizes 10000 --excel   # 包含Excel解析阶段
+    python -m benchmarks.run_benchmarks --compare baseline.json current.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.chart_generators import TaskTrendChartGenerator
+from core.data_services import (
+    DataProcessingService,
+    DateRangeIndex,
+    FilterIndex,
+    TaskCubeService,
+)
+from core.excel_cache import excel_parse_cache
+from core.task_data_processor import (
+    EmployeeLookup,
+    merge_personnel_files,
+    merge_vehicle_with_tasks,
+    process_task_progress,
+    process_vehicle_attendance,
+    read_input_files,
+)
+from core.vehicle_data_processor import DataChecker
+
+from .data_generator import generate_datasets, write_workbooks
+
+DEFAULT_SIZES = [10000, 100000, 1000000]
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def measure(fn: Callable[[], Any], repeat: int, trace_memory: bool) -> Dict[str, Any]:
+    """执行阶段函数并计时；需要时再单独运行一次记录峰值内存
+
+    tracemalloc会明显拖慢执行，因此计时与内存统计分开运行；tracemalloc只统计
+    Python和NumPy的内存分配，Arrow等扩展库自行分配的内存不计入。
+    """
+    timings = []
+    value = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        value = fn()
+        timings.append(time.perf_counter() - start)
+
+    peak_mb = None
+    if trace_memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        peak_mb = round(peak / 1024 / 1024, 2)
+
+    return {
+        "value": value,
+        "seconds": round(min(timings), 6),
+        "mean_seconds": round(float(np.mean(timings)), 6),
+        "peak_memory_mb": peak_mb,
+    }
+
+
+def build_stages(
+    datasets: Dict[str, pd.DataFrame], paths: Optional[Dict[str, str]]
+) -> List[tuple]:
+    """各测试阶段：(阶段名, 函数)，函数接收前面阶段的结果并返回本阶段结果"""
+    if paths:
+        stages = [("解析输入文件", lambda ctx: read_input_files(paths))]
+    else:
+        stages = [("载入内存数据", lambda ctx: dict(datasets))]
+    load_stage = stages[0][0]
+
+    stages += [
+        ("构建员工映射", lambda ctx: EmployeeLookup(ctx[load_stage]["employee"])),
+        (
+            "合并人员信息",
+            lambda ctx: merge_personnel_files(
+                ctx[load_stage]["personnel"], ctx["构建员工映射"]
+            ),
+        ),
+        (
+            "处理车辆出勤记录",
+            lambda ctx: process_vehicle_attendance(
+                ctx[load_stage]["vehicle"],
+                ctx["合并人员信息"],
+                ctx["构建员工映射"].identities,
+            ),
+        ),
+        (
+            "处理任务进展",
+            lambda ctx: process_task_progress(
+                ctx[load_stage]["task"], ctx["构建员工映射"]
+            ),
+        ),
+        (
+            "合并车辆和任务数据",
+            lambda ctx: merge_vehicle_with_tasks(
+                ctx["处理车辆出勤记录"],
+                ctx["处理任务进展"],
+                ctx["构建员工映射"].identities,
+            ),
+        ),
+        (
+            "车辆数据核查",
+            lambda ctx: DataChecker().perform_all_checks(
+                ctx[load_stage]["vehicle"].copy(deep=False)
+            ),
+        ),
+        ("构建聚合立方体", lambda ctx: TaskCubeService.build_cube(ctx["处理任务进展"])),
+        ("构建筛选索引", lambda ctx: FilterIndex(ctx["构建聚合立方体"])),
+        ("构建日期索引", lambda ctx: DateRangeIndex(ctx["构建聚合立方体"])),
+        ("日期区间筛选", lambda ctx: _select_sample(ctx["构建日期索引"])),
+        (
+            "上传人统计",
+            lambda ctx: DataProcessingService.calculate_uploader_stats(
+                ctx["构建聚合立方体"]
+            ),
+        ),
+        (
+            "城市趋势统计",
+            lambda ctx: DataProcessingService.calculate_city_trends(
+                ctx["构建聚合立方体"]
+            ),
+        ),
+        (
+            "趋势数据汇总",
+            lambda ctx: DataProcessingService.get_trend_summary(ctx["构建聚合立方体"]),
+        ),
+        (
+            "趋势图绘制",
+            # 绕过图表缓存，测量实际绘制耗时
+            lambda ctx: TaskTrendChartGenerator.create_trend_chart.__wrapped__(
+                ctx["构建聚合立方体"]
+            ),
+        ),
+    ]
+    return stages
+
+
+def _select_sample(date_index: DateRangeIndex) -> pd.DataFrame:
+    """按第一个省份和中间一个月的日期区间筛选"""
+    frame = date_index.frame
+    dates = frame["日期"].dropna()
+    if dates.empty:
+        return frame.iloc[:0]
+    middle = dates.iloc[len(dates) // 2]
+    province = frame["省"].dropna().iloc[0] if "省" in frame.columns else None
+    return date_index.select(
+        province, start_date=middle - pd.Timedelta(days=15), end_date=middle
+    )
+
+
+def run_size(
+    rows: int, repeat: int, trace_memory: bool, excel: bool, seed: int
+) -> List[Dict[str, Any]]:
+    """测试一个数据规模，返回各阶段结果"""
+    datasets = generate_datasets(rows, seed=seed)
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = write_workbooks(datasets, tmp_dir) if excel else None
+
+        context = {}
+        for stage, fn in build_stages(datasets, paths):
+            measured = measure(lambda: fn(context), repeat, trace_memory)
+            context[stage] = measured.pop("value")
+
+            result = {"rows": rows, "stage": stage, "repeat": repeat, **measured}
+            results.append(result)
+            memory = (
+                f"{result['peak_memory_mb']:>10.1f} MB"
+                if result["peak_memory_mb"] is not None
+                else ""
+            )
+            print(f"{rows:>9} {stage:<12} {result['seconds']:>10.4f} s{memory}")
+
+    return results
+
+
+def environment_info() -> Dict[str, Any]:
+    """记录运行环境和代码版本，便于对比"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = 1.2) -> List[str]:
+    """对比两次结果，返回耗时或峰值内存超过基线threshold倍的阶段"""
+    baseline_index = {(r["rows"], r["stage"]): r for r in baseline["results"]}
+    regressions = []
+
+    print(f"{'行数':>9} {'阶段':<12} {'基线(s)':>10} {'当前(s)':>10} {'比值':>7}")
+    for result in current["results"]:
+        base = baseline_index.get((result["rows"], result["stage"]))
+        if base is None:
+            continue
+
+        ratio = result["seconds"] / base["seconds"] if base["seconds"] else float("inf")
+        print(
+            f"{result['rows']:>9} {result['stage']:<12} "
+            f"{base['seconds']:>10.4f} {result['seconds']:>10.4f} {ratio:>7.2f}"
+        )
+        if ratio > threshold:
+            regressions.append(f"{result['rows']} {result['stage']} 耗时 x{ratio:.2f}")
+
+        if base.get("peak_memory_mb") and result.get("peak_memory_mb"):
+            memory_ratio = result["peak_memory_mb"] / base["peak_memory_mb"]
+            if memory_ratio > threshold:
+                regressions.append(
+                    f"{result['rows']} {result['stage']} 峰值内存 x{memory_ratio:.2f}"
+                )
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="数据处理流程性能测试")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="测试的数据行数"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="每个阶段的计时次数")
+    parser.add_argument("--seed", type=int, default=0, help="模拟数据随机种子")
+    parser.add_argument(
+        "--excel", action="store_true", help="写出Excel文件并测试解析阶段（较慢）"
+    )
+    parser.add_argument("--no-memory", action="store_true", help="不统计峰值内存")
+    parser.add_argument("--output", help="结果JSON路径，默认写入 benchmarks/results/")
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("BASELINE", "CURRENT"),
+        help="对比两个结果文件并列出性能回退的阶段",
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=1.2, help="判定回退的比值阈值"
+    )
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as f:
+            baseline = json.load(f)
+        with open(args.compare[1], encoding="utf-8") as f:
+            current = json.load(f)
+        regressions = compare_results(baseline, current, args.threshold)
+        for line in regressions:
+            print(f"回退: {line}")
+        raise SystemExit(1 if regressions else 0)
+
+    # 解析阶段测量实际解析耗时，不使用磁盘解析缓存
+    excel_parse_cache.enabled = False
+
+    results = []
+    for rows in args.sizes:
+        results += run_size(
+            rows, args.repeat, not args.no_memory, args.excel, args.seed
+        )
+
+    report = {
+        "environment": environment_info(),
+        "config": {
+            "sizes": args.sizes,
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "excel": args.excel,
+        },
+        "results": results,
+    }
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入 {output}")
+
+
+if __name__ == "__main__":
+    main()
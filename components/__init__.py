@@ -15,6 +15,8 @@ from .layout_components import (
     create_stats_dashboard,
     create_loading_spinner,
     create_progress_bar,
+    wait_for_job,
+    memoize_section,
     create_column_layout,
     create_tab_layout,
     create_footer
@@ -33,6 +35,8 @@ __all__ = [
     'create_stats_dashboard',
     'create_loading_spinner',
     'create_progress_bar',
+    'wait_for_job',
+    'memoize_section',
     'create_column_layout',
     'create_tab_layout',
     'create_footer'
@@ -1,7 +1,9 @@
 # components/layout_components.py
+import time
 import streamlit as st
+import pandas as pd
 from typing import Dict, Any, Optional, Union, List
-from config import PAGES_CONFIG, SYSTEM_CONSTANTS
+from config import PAGES_CONFIG, PIPELINE_CONFIG, SYSTEM_CONSTANTS
 
 
 def setup_page(
@@ -320,6 +322,55 @@ def create_progress_bar(total: int, current: int, label: str = "进度"):
     st.progress(progress, text=f"{label}: {current}/{total} ({progress:.1%})")
 
 
+def wait_for_job(job, poll_interval: Optional[float] = None):
+    """显示后台任务的阶段进度，直到任务结束
+
+    页面重新运行会中断等待，但不影响后台任务；下次运行时继续显示进度。
+    """
+    interval = poll_interval or PIPELINE_CONFIG["job_poll_interval"]
+    placeholder = st.empty()
+    while not job.done:
+        with placeholder.container():
+            create_progress_bar(job.total, job.current, job.label)
+        time.sleep(interval)
+    placeholder.empty()
+
+
+def _same_input(previous, current) -> bool:
+    """比较区块输入：数据对象按身份比较，筛选条件等普通值按值比较"""
+    if previous is current:
+        return True
+    # 数据对象只按身份比较，逐元素比较既耗时又无法得到单个布尔值
+    if isinstance(previous, (pd.DataFrame, pd.Series, pd.Index)) or isinstance(
+        current, (pd.DataFrame, pd.Series, pd.Index)
+    ):
+        return False
+    try:
+        return (previous == current) is True
+    except Exception:
+        return False
+
+
+def memoize_section(name: str, inputs: tuple, compute):
+    """记忆页面区块的计算结果
+
+    每个区块只保留最近一次的输入和结果；输入未变化时直接复用，
+    使筛选条件变化只重新计算其所属的区块。
+    """
+    cache = st.session_state.setdefault("section_cache", {})
+    cached = cache.get(name)
+    if (
+        cached is not None
+        and len(cached[0]) == len(inputs)
+        and all(_same_input(a, b) for a, b in zip(cached[0], inputs))
+    ):
+        return cached[1]
+
+    value = compute()
+    cache[name] = (tuple(inputs), value)
+    return value
+
+
 def create_column_layout(num_columns: int = 2, ratios: List[float] = None):
     """创建列布局"""
     if ratios and len(ratios) == num_columns:
@@ -1,7 +1,10 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 from typing import List, Dict, Any, Optional
-from core.data_services import FilterService
+from config import SYSTEM_CONSTANTS
+from core.data_services import FilterIndex, FilterService
+from .layout_components import memoize_section
 
 
 class FilterComponents:
@@ -71,7 +74,7 @@ class FilterComponents:
         for i, filter_type in enumerate(filter_types):
             with cols[i]:
                 if filter_type == "province":
-                    options = ["全部"] + sorted(df["省"].dropna().unique()) if "省" in df.columns else ["全部"]
+                    options = FilterIndex.for_dataframe(df).province_options()
                     filters["province"] = st.selectbox(
                         "选择省份", options=options, key=f"{key_prefix}_province"
                     )
@@ -127,6 +130,113 @@ class ChartComponents:
                 st.metric(label=config["label"], value=value)
 
 
+class TableComponents:
+    """分页表格组件"""
+    
+    @staticmethod
+    def _reset_page(key: str):
+        """搜索或排序条件变化时回到第一页"""
+        st.session_state[f"{key}_page"] = 1
+    
+    @staticmethod
+    def _view_positions(df, columns: List[str], query: str, sort_col: Optional[str], ascending: bool) -> np.ndarray:
+        """计算搜索、排序后的行位置（不复制数据）"""
+        positions = np.arange(len(df))
+        
+        if query:
+            # 任一列的文本包含关键字即命中（不区分大小写）
+            mask = np.zeros(len(df), dtype=bool)
+            for col in columns:
+                mask |= df[col].astype(str).str.contains(
+                    query, case=False, regex=False, na=False
+                ).to_numpy()
+            positions = positions[mask]
+        
+        if sort_col:
+            values = df[sort_col].iloc[positions].reset_index(drop=True)
+            try:
+                order = values.sort_values(ascending=ascending, kind="stable", na_position="last").index
+            except TypeError:
+                # 混合类型的列按文本排序
+                order = values.astype(str).sort_values(ascending=ascending, kind="stable").index
+            positions = positions[order.to_numpy()]
+        
+        return positions
+    
+    @staticmethod
+    def display_paginated_dataframe(
+        df,
+        key: str,
+        page_size: Optional[int] = None,
+        exclude_columns: Optional[List[str]] = None,
+        **dataframe_options,
+    ):
+        """分页显示数据表格
+        
+        搜索、排序和分页均在服务端完成，只向页面发送当前页的数据；
+        exclude_columns中的列不参与显示、搜索和排序。
+        """
+        if df.empty:
+            st.info("暂无数据")
+            return
+        
+        page_size = page_size or SYSTEM_CONSTANTS["DEFAULT_PAGE_SIZE"]
+        excluded = set(exclude_columns or [])
+        columns = [col for col in df.columns if col not in excluded]
+        page_key = f"{key}_page"
+        
+        col_search, col_sort, col_order, col_page = st.columns([3, 2, 1, 1])
+        
+        with col_search:
+            query = st.text_input(
+                "搜索", key=f"{key}_search", placeholder="输入关键字筛选",
+                on_change=TableComponents._reset_page, args=(key,)
+            )
+        
+        with col_sort:
+            sort_col = st.selectbox(
+                "排序列", ["不排序"] + columns, key=f"{key}_sort",
+                on_change=TableComponents._reset_page, args=(key,)
+            )
+        
+        with col_order:
+            ascending = st.radio(
+                "顺序", ["升序", "降序"], key=f"{key}_order", horizontal=True,
+                on_change=TableComponents._reset_page, args=(key,)
+            ) == "升序"
+        
+        sort_col = None if sort_col == "不排序" else sort_col
+        
+        # 搜索/排序结果按条件记忆，翻页时直接复用
+        if query or sort_col:
+            positions = memoize_section(
+                f"{key}_table",
+                (df, tuple(columns), query, sort_col, ascending),
+                lambda: TableComponents._view_positions(df, columns, query, sort_col, ascending),
+            )
+            total = len(positions)
+        else:
+            positions = None
+            total = len(df)
+        
+        page_count = max(1, -(-total // page_size))
+        # 数据变化后页码可能越界，先收回到最后一页
+        if st.session_state.get(page_key, 1) > page_count:
+            st.session_state[page_key] = page_count
+        
+        with col_page:
+            page = st.number_input(
+                "页码", min_value=1, max_value=page_count, step=1, key=page_key
+            )
+        
+        start = (int(page) - 1) * page_size
+        rows = slice(start, start + page_size)
+        page_df = df.iloc[rows] if positions is None else df.iloc[positions[rows]]
+        
+        st.dataframe(page_df[columns], **dataframe_options)
+        st.caption(f"共 {total} 条记录，第 {int(page)}/{page_count} 页，每页 {page_size} 条")
+
+
 class FileUploadComponents:
     """文件上传组件"""
     
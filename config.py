@@ -76,6 +76,14 @@ CHART_COLORS = {
     "light_red": "#EF9A9A",
 }
 
+# 趋势图渲染配置（按整张图的数据点数自适应）
+CHART_RENDER_CONFIG = {
+    "point_budget": 5000,  # 整张图的数据点预算，超出时按LTTB降采样各序列
+    "min_points_per_series": 100,  # 每个序列降采样后至少保留的点数
+    "text_label_max_points": 300,  # 数据点超过该数量时不显示逐点文字标签
+    "webgl_min_points": 2000,  # 数据点超过该数量时使用WebGL（Scattergl）绘制
+}
+
 # 数据验证规则
 VALIDATION_RULES = {
     "work_duration": {
@@ -138,6 +146,57 @@ COLUMN_MAPPINGS = {
     "numeric_columns": ["工作时长", "行驶里程", "路桥费", "加班费"],
 }
 
+# 输入文件结构定义：读取时只解析声明的列，并按声明的类型转换
+# （keep_all_columns为True时保留全部列，只做类型转换和必需列检查）
+FILE_SCHEMAS = {
+    "personnel": {
+        "header": 1,
+        "required_columns": ["u_uid", "员工编号", "员工姓名", "身份证号"],
+        "optional_columns": [],
+        "dtypes": {"u_uid": str, "身份证号": str},
+        "date_columns": [],
+    },
+    "employee": {
+        "header": 0,
+        "required_columns": ["*资源姓名", "Uniportal账号", "*ID编码"],
+        "optional_columns": [],
+        "dtypes": {"Uniportal账号": str, "*ID编码": str},
+        "date_columns": [],
+    },
+    "vehicle": {
+        "header": 1,
+        "required_columns": ["日期", "上传人id"],
+        "optional_columns": [],
+        "keep_all_columns": True,
+        "dtypes": {"上传人id": str},
+        "date_columns": ["日期"],
+    },
+    "task": {
+        "header": 0,
+        "required_columns": [
+            "工单类别",
+            "工单日期",
+            "省份",
+            "地市",
+            "责任人账号",
+            "任务状态",
+        ],
+        "optional_columns": ["责任人姓名"],
+        "dtypes": {"责任人账号": str},
+        "date_columns": ["工单日期"],
+    },
+    # 车辆分析页面导入的出勤记录，缺失的列对应的核查项自动跳过；
+    # 出勤记录的全部列都会进入明细、导出和批处理结果，不做列裁剪
+    "attendance": {
+        "header": 1,
+        "required_columns": [],
+        "optional_columns": [],
+        "keep_all_columns": True,
+        "dtypes": {},
+        "date_columns": [],
+    },
+}
+
 # 系统常量
 SYSTEM_CONSTANTS = {
     "APP_NAME": "内控管理分析系统",
@@ -159,3 +218,38 @@ EXPORT_CONFIG = {
     "compress_large_files": True,
     "large_file_threshold_mb": 10,
 }
+
+# 缓存配置
+CACHE_CONFIG = {
+    "parse_cache_enabled": True,
+    "parse_cache_dir": ".cache/excel_parse",  # Excel解析缓存目录
+    "parse_cache_max_mb": 500,  # 解析缓存容量上限
+    "result_cache_enabled": True,
+    "result_cache_max_mb": 1024,  # 进程内共享结果缓存的内存上限
+    "figure_cache_enabled": True,
+    "figure_cache_max_mb": 128,  # 序列化图表缓存的内存上限
+    "figure_cache_min_rows": 1000,  # 输入少于该行数时直接绘图（还原图表比绘制更慢）
+}
+
+# 数据处理流程配置
+PIPELINE_CONFIG = {
+    "ingest_workers": 4,  # 并行解析输入文件的工作线程/进程数
+    "ingest_executor": "thread",  # thread: 线程池; process: 进程池
+    "job_workers": 2,  # 后台处理任务的工作线程数（各会话共用）
+    "job_retention_seconds": 3600,  # 已结束任务的保留时间
+    "job_poll_interval": 0.5,  # 页面刷新任务进度的间隔（秒）
+}
+
+# 批处理命令行配置（python -m core.batch）
+BATCH_CONFIG = {
+    "workers": 4,  # 并行处理的工作进程数（每个月份/文件一个任务）
+    # 工单分析：每个目录为一批（如一个月），按文件名模式查找四个输入文件
+    "task_file_patterns": {
+        "personnel": "*人员明细*.xlsx",
+        "employee": "*IResourceEmployee*.xlsx",
+        "vehicle": "*车辆出勤记录*.xlsx",
+        "task": "*工单履行率*.xlsx",
+    },
+    # 车辆数据核查：目录中按该模式查找出勤记录文件
+    "vehicle_file_pattern": "*车辆出勤记录*.xlsx",
+}
@@ -5,20 +5,37 @@
 from .vehicle_data_processor import (
     DataChecker as VehicleDataChecker,
     get_default_config as get_vehicle_default_config,
+    get_abnormal_mask,
 )
 
+from .identity_registry import IdentityRegistry
+from .pipeline_graph import PipelineGraph
+
 from .task_data_processor import (
+    EmployeeLookup,
+    load_employee_lookup,
     merge_personnel_files,
     process_vehicle_attendance,
     process_task_progress,
     merge_vehicle_with_tasks,
+    read_input_files,
+    run_task_pipeline,
+    TASK_PIPELINE_STAGES,
 )
 
 __all__ = [
     "VehicleDataChecker",
     "get_vehicle_default_config",
+    "get_abnormal_mask",
+    "IdentityRegistry",
+    "PipelineGraph",
+    "EmployeeLookup",
+    "load_employee_lookup",
     "merge_personnel_files",
     "process_vehicle_attendance",
     "process_task_progress",
     "merge_vehicle_with_tasks",
+    "read_input_files",
+    "run_task_pipeline",
+    "TASK_PIPELINE_STAGES",
 ]
@@ -0,0 +1,262 @@
+"""命令行批处理：不启动Streamlit，批量执行工单分析流程和车辆数据核查
+
+输入可以是目录、文件或通配符；多个批次（如多个月份）在工作进程中并行处理，
+结果写出为Parquet文件，并打印每个批次各阶段的耗时。
+
+用法：
+    # 工单分析：每个目录为一批，目录中按 BATCH_CONFIG 的文件名模式查找四个输入文件
+    python -m core.batch task "data/2026-*" --output output/task
+    # 各月共用的人员明细和员工文件可单独指定（目录中找不到时使用）
+    python -m core.batch task data/2026-01 data/2026-02 --employee data/员工.xlsx
+
+    # 车辆数据核查：文件、目录或通配符
+    python -m core.batch vehicle "data/*/车辆出勤记录*.xlsx" --output output/vehicle
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from config import BATCH_CONFIG
+from .result_cache import shared_result_cache
+from .task_data_processor import run_task_pipeline
+from .vehicle_data_processor import DataChecker, get_abnormal_mask, get_default_config
+
+TASK_FILE_KINDS = ["personnel", "employee", "vehicle", "task"]
+
+
+def expand_inputs(patterns: List[str]) -> List[str]:
+    """展开通配符，返回去重后按名称排序的路径"""
+    paths = []
+    for pattern in patterns:
+        matches = glob.glob(pattern) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            raise FileNotFoundError(f"没有匹配的输入: {pattern}")
+        paths += matches
+    return sorted(set(os.path.normpath(path) for path in paths))
+
+
+def _find_file(directory: str, pattern: str) -> Optional[str]:
+    """在目录中按文件名模式查找文件，有多个时取名称最大的（通常为最新导出）"""
+    matches = sorted(
+        path
+        for path in glob.glob(os.path.join(directory, pattern))
+        if not os.path.basename(path).startswith("~$")
+    )
+    return matches[-1] if matches else None
+
+
+def find_task_files(
+    directory: str, defaults: Dict[str, Optional[str]]
+) -> Dict[str, str]:
+    """查找一个批次目录中的四个输入文件，目录中没有时使用defaults中指定的文件"""
+    files = {}
+    for kind in TASK_FILE_KINDS:
+        path = _find_file(directory, BATCH_CONFIG["task_file_patterns"][kind])
+        files[kind] = path or defaults.get(kind)
+
+    missing = [kind for kind, path in files.items() if not path]
+    if missing:
+        raise FileNotFoundError(f"{directory} 缺少输入文件: {', '.join(missing)}")
+    return files
+
+
+def find_vehicle_files(paths: List[str]) -> List[str]:
+    """车辆出勤记录文件：目录按文件名模式查找，文件直接使用"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            pattern = os.path.join(path, BATCH_CONFIG["vehicle_file_pattern"])
+            files += sorted(glob.glob(pattern))
+        else:
+            files.append(path)
+    return files
+
+
+def _write_parquet(df: pd.DataFrame, path: str):
+    """写出Parquet文件（不含索引）"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    df.to_parquet(path, index=False)
+
+
+def run_task_batch(
+    directory: str, output_dir: str, defaults: Dict[str, Optional[str]]
+) -> Dict[str, Any]:
+    """执行一个批次目录的工单分析流程，写出合并结果和任务进展"""
+    # 按上级目录+批次目录分开写出，不同位置的同名目录（以及"."）不会互相覆盖
+    path = os.path.abspath(directory)
+    parent = os.path.basename(os.path.dirname(path))
+    batch = os.path.basename(path)
+    files = find_task_files(directory, defaults)
+    final_df, task_df = run_task_pipeline(
+        files["personnel"], files["employee"], files["vehicle"], files["task"]
+    )
+    # 流程各节点的耗时（取自缓存的节点耗时为0）
+    stages = [
+        (node["stage"], node["node"], node["seconds"])
+        for node in final_df.attrs.get("pipeline_stats", [])
+    ]
+
+    start = time.perf_counter()
+    final_path = os.path.join(output_dir, parent, batch, "final.parquet")
+    _write_parquet(final_df, final_path)
+    _write_parquet(task_df, os.path.join(output_dir, parent, batch, "task.parquet"))
+    stages.append(("写出结果", "", time.perf_counter() - start))
+
+    match_stats = final_df.attrs.get("task_match_stats", {})
+    return {
+        "name": f"{parent}/{batch}",
+        "rows": len(final_df),
+        "output": final_path,
+        "stages": stages,
+        "summary": f"匹配工单 {match_stats.get('matched', 0)} 条，"
+        f"未匹配 {match_stats.get('unmatched', 0)} 条",
+    }
+
+
+def run_vehicle_batch(
+    path: str, output_dir: str, config: Dict[str, Any]
+) -> Dict[str, Any]:
+    """核查一个车辆出勤记录文件，写出带核查结果的数据"""
+    checker = DataChecker(config)
+    stages = []
+
+    start = time.perf_counter()
+    df = checker.load_data(path)
+    stages.append(("解析文件", "", time.perf_counter() - start))
+
+    start = time.perf_counter()
+    df = checker.perform_all_checks(df)
+    stages.append(("数据核查", "", time.perf_counter() - start))
+
+    start = time.perf_counter()
+    # 按所在目录分开写出，不同月份目录中的同名文件不会互相覆盖
+    name = os.path.splitext(os.path.basename(path))[0]
+    batch = os.path.basename(os.path.dirname(os.path.abspath(path)))
+    output = os.path.join(output_dir, batch, f"{name}_核查.parquet")
+    _write_parquet(df, output)
+    stages.append(("写出结果", "", time.perf_counter() - start))
+
+    abnormal = int(get_abnormal_mask(df).sum())
+    return {
+        "name": f"{batch}/{name}",
+        "rows": len(df),
+        "output": output,
+        "stages": stages,
+        "summary": f"异常记录 {abnormal} 条",
+    }
+
+
+def _init_worker():
+    """工作进程只处理各自的批次，不需要进程内结果缓存"""
+    shared_result_cache.enabled = False
+
+
+def _run_job(fn: Callable[..., Dict[str, Any]], args: tuple) -> Dict[str, Any]:
+    """执行一个批次并计时，失败时记录异常信息而不中断其他批次"""
+    start = time.perf_counter()
+    try:
+        result = fn(*args)
+    except Exception as e:
+        result = {"name": str(args[0]), "error": f"{type(e).__name__}: {e}"}
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def run_jobs(
+    fn: Callable[..., Dict[str, Any]], jobs: List[tuple], workers: int
+) -> List[Dict[str, Any]]:
+    """在工作进程中并行执行各批次，按提交顺序返回结果"""
+    if workers <= 1 or len(jobs) <= 1:
+        _init_worker()
+        return [_run_job(fn, args) for args in jobs]
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(jobs)), initializer=_init_worker
+    ) as executor:
+        futures = [executor.submit(_run_job, fn, args) for args in jobs]
+        return [future.result() for future in futures]
+
+
+def print_report(results: List[Dict[str, Any]]):
+    """打印各批次的阶段耗时和汇总"""
+    for result in results:
+        if "error" in result:
+            print(f"[失败] {result['name']}: {result['error']}")
+            continue
+
+        print(
+            f"[完成] {result['name']}: {result['rows']} 行，{result['summary']}，"
+            f"耗时 {result['seconds']:.2f} s -> {result['output']}"
+        )
+        for stage, node, seconds in result["stages"]:
+            print(f"    {stage:<12} {node:<32} {seconds:>10.4f} s")
+
+    failed = sum("error" in result for result in results)
+    print(f"共 {len(results)} 个批次，成功 {len(results) - failed}，失败 {failed}")
+
+
+def _load_vehicle_config(path: Optional[str]) -> Dict[str, Any]:
+    """核查配置：默认配置，可用JSON文件按核查项覆盖"""
+    config = get_default_config()
+    if path:
+        with open(path, encoding="utf-8") as f:
+            for section, values in json.load(f).items():
+                config.setdefault(section, {}).update(values)
+    return config
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="工单分析和车辆数据核查批处理")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=BATCH_CONFIG["workers"],
+        help="并行处理的工作进程数",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    task_parser = subparsers.add_parser("task", help="工单分析流程")
+    task_parser.add_argument("inputs", nargs="+", help="批次目录或通配符")
+    task_parser.add_argument("--output", default="output/task", help="输出目录")
+    for kind, label in [("personnel", "人员明细"), ("employee", "员工资源")]:
+        task_parser.add_argument(
+            f"--{kind}", help=f"{label}文件（批次目录中没有时使用）"
+        )
+
+    vehicle_parser = subparsers.add_parser("vehicle", help="车辆数据核查")
+    vehicle_parser.add_argument("inputs", nargs="+", help="文件、目录或通配符")
+    vehicle_parser.add_argument("--output", default="output/vehicle", help="输出目录")
+    vehicle_parser.add_argument("--config", help="核查门限配置JSON文件")
+
+    args = parser.parse_args(argv)
+    paths = expand_inputs(args.inputs)
+
+    if args.command == "task":
+        not_dirs = [path for path in paths if not os.path.isdir(path)]
+        if not_dirs:
+            parser.error(f"工单分析的输入须为批次目录: {', '.join(not_dirs)}")
+        defaults = {"personnel": args.personnel, "employee": args.employee}
+        jobs = [(path, args.output, defaults) for path in paths]
+        fn = run_task_batch
+    else:
+        config = _load_vehicle_config(args.config)
+        jobs = [(path, args.output, config) for path in find_vehicle_files(paths)]
+        fn = run_vehicle_batch
+
+    if not jobs:
+        parser.error("没有找到需要处理的输入")
+
+    results = run_jobs(fn, jobs, args.workers)
+    print_report(results)
+    return 1 if any("error" in result for result in results) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,6 +2,10 @@ import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 
+from .data_services import TaskCubeService
+from .chart_sampling import TrendRenderPlan
+from .figure_cache import cached_figure
+
 
 class ChartGenerator:
     """图表生成器基类"""
@@ -21,6 +25,7 @@ class TaskTrendChartGenerator(ChartGenerator):
     """任务趋势图表生成器"""
     
     @staticmethod
+    @cached_figure
     def create_trend_chart(df, date_col="日期", chart_title="任务趋势"):
         """创建任务完成+通过总和趋势图"""
         if "完成" not in df.columns or "通过" not in df.columns:
@@ -28,13 +33,15 @@ class TaskTrendChartGenerator(ChartGenerator):
             fig.update_layout(title=chart_title, height=400)
             return fig
 
-        df = df.copy()
-        df["完成+通过"] = df["完成"] + df["通过"]
+        # 完成+通过按需计算，不复制数据集
+        completed = TaskCubeService.completed(df)
         
         if "市" in df.columns:
             # 多城市趋势图
-            city_date_grouped = df.groupby(["市", date_col])["完成+通过"].sum().reset_index()
+            city_date_grouped = completed.groupby([df["市"], df[date_col]]).sum().reset_index()
             city_date_grouped[date_col] = pd.to_datetime(city_date_grouped[date_col])
+            # 按数据点数决定降采样、文字标签和WebGL
+            plan = TrendRenderPlan(city_date_grouped.groupby("市", sort=False, observed=True).size())
             
             fig = go.Figure()
             colors = px.colors.qualitative.Set3 + px.colors.qualitative.Pastel
@@ -42,10 +49,9 @@ class TaskTrendChartGenerator(ChartGenerator):
             for i, city in enumerate(city_date_grouped["市"].unique()):
                 city_data = city_date_grouped[city_date_grouped["市"] == city].sort_values(date_col)
                 fig.add_trace(
-                    go.Scatter(
+                    plan.scatter(
                         x=city_data[date_col],
                         y=city_data["完成+通过"],
-                        mode="lines+markers+text",
                         name=city,
                         line=dict(
                             color=colors[i % len(colors)],
@@ -61,16 +67,16 @@ class TaskTrendChartGenerator(ChartGenerator):
                 )
         else:
             # 单趋势图
-            date_grouped = df.groupby(date_col)["完成+通过"].sum().reset_index()
+            date_grouped = completed.groupby(df[date_col]).sum().reset_index()
             date_grouped[date_col] = pd.to_datetime(date_grouped[date_col])
             date_grouped = date_grouped.sort_values(date_col)
+            plan = TrendRenderPlan([len(date_grouped)])
 
             fig = go.Figure()
             fig.add_trace(
-                go.Scatter(
+                plan.scatter(
                     x=date_grouped[date_col],
                     y=date_grouped["完成+通过"],
-                    mode="lines+markers+text",
                     name="完成+通过",
                     line=dict(
                         color="#2ca02c",
@@ -137,6 +143,7 @@ class GroupedBarChartGenerator(ChartGenerator):
     """分组柱状图生成器"""
     
     @staticmethod
+    @cached_figure
     def create_grouped_bar_chart(df, group_cols, title="分组柱状图"):
         """创建分组柱状图"""
         status_cols = ["待执行", "完成", "通过", "未知"]
@@ -188,6 +195,7 @@ class ZeroDaysChartGenerator(ChartGenerator):
     """零任务天数图表生成器"""
     
     @staticmethod
+    @cached_figure
     def create_zero_days_chart(df, group_cols, title="零任务天数统计"):
         """创建零任务天数统计图"""
         status_cols = ["待执行", "完成", "通过"]
@@ -200,11 +208,13 @@ class ZeroDaysChartGenerator(ChartGenerator):
         for col in group_cols:
             filter_condition &= df[col].notna()
 
-        valid_df = df[filter_condition].copy()
-        valid_df["任务总数"] = valid_df[status_cols].sum(axis=1)
+        valid_df = df[filter_condition]
+        task_total = valid_df[status_cols].sum(axis=1).rename("任务总数")
         
         group_cols_with_date = group_cols + ["日期"]
-        daily_stats = valid_df.groupby(group_cols_with_date)["任务总数"].sum().reset_index()
+        daily_stats = task_total.groupby(
+            [valid_df[col] for col in group_cols_with_date]
+        ).sum().reset_index()
         daily_stats["为零天数"] = (daily_stats["任务总数"] == 0).astype(int)
         
         result = daily_stats.groupby(group_cols)["为零天数"].sum().reset_index()
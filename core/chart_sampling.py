@@ -0,0 +1,126 @@
+from typing import Any, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from config import CHART_RENDER_CONFIG
+
+
+def lttb_indices(x, y, threshold: int) -> np.ndarray:
+    """最大三角形三桶（LTTB）降采样，返回保留点的位置
+
+    保留首尾两点，中间的点均分为threshold-2个桶，每个桶选出与前一个保留点、
+    下一个桶均值点构成三角形面积最大的点，从而保留峰谷等形状特征。
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    selected = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        area = np.abs(
+            (x[selected] - avg_x) * (y[start:end] - y[selected])
+            - (x[selected] - x[start:end]) * (avg_y - y[selected])
+        )
+        selected = start + int(np.argmax(area))
+        indices[i + 1] = selected
+
+    return indices
+
+
+def _numeric_axis(x) -> np.ndarray:
+    """将横轴转换为数值（日期按时间戳），无法转换时按位置"""
+    values = pd.Series(x)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    try:
+        return values.to_numpy(dtype=float)
+    except (TypeError, ValueError):
+        return np.arange(len(values), dtype=float)
+
+
+def _take(values, positions: np.ndarray):
+    """按位置取子集，保留pandas对象类型"""
+    if values is None:
+        return None
+    if isinstance(values, (pd.Series, pd.Index)):
+        return (
+            values[positions]
+            if isinstance(values, pd.Index)
+            else values.iloc[positions]
+        )
+    return np.asarray(values)[positions]
+
+
+class TrendRenderPlan:
+    """趋势图渲染方案
+
+    按整张图的数据点数决定：超出点数预算时按LTTB降采样各序列，点数较多时
+    不显示逐点文字标签，点数很多时改用WebGL（Scattergl）绘制。
+    数据量较小时生成的轨迹与普通折线图完全一致。
+    """
+
+    def __init__(self, series_lengths: Iterable[int]):
+        lengths = list(series_lengths)
+        config = CHART_RENDER_CONFIG
+
+        self.max_points = max(
+            config["min_points_per_series"],
+            config["point_budget"] // max(1, len(lengths)),
+        )
+        rendered = sum(min(length, self.max_points) for length in lengths)
+        self.show_text = rendered <= config["text_label_max_points"]
+        self.use_webgl = rendered > config["webgl_min_points"]
+
+    def scatter(
+        self,
+        x,
+        y,
+        text=None,
+        line: Optional[dict] = None,
+        textposition: str = "top center",
+        textfont: Optional[dict] = None,
+        **options: Any,
+    ):
+        """创建折线轨迹（lines+markers，按方案附加文字标签）"""
+        if len(x) > self.max_points:
+            positions = lttb_indices(_numeric_axis(x), y, self.max_points)
+            x, y, text = (
+                _take(x, positions),
+                _take(y, positions),
+                _take(text, positions),
+            )
+
+        trace_options = dict(x=x, y=y, **options)
+        if self.show_text and text is not None:
+            trace_options.update(
+                mode="lines+markers+text",
+                text=text,
+                textposition=textposition,
+                textfont=textfont,
+            )
+        else:
+            trace_options["mode"] = "lines+markers"
+
+        if self.use_webgl:
+            # WebGL折线不支持样条平滑
+            if line is not None:
+                line = {
+                    k: v for k, v in line.items() if k not in ("shape", "smoothing")
+                }
+            return go.Scattergl(line=line, **trace_options)
+        return go.Scatter(line=line, **trace_options)
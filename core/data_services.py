@@ -1,5 +1,10 @@
+import weakref
+
+import numpy as np
 import pandas as pd
-from typing import Optional
+from typing import Callable, Dict, Optional
+
+from .task_data_processor import TASK_STATUS_COLUMNS
 
 
 class DataProcessingService:
@@ -7,25 +12,14 @@ class DataProcessingService:
     
     @staticmethod
     def process_trend_data(df, filters: dict) -> pd.DataFrame:
-        """处理趋势数据筛选"""
-        filtered_df = df.copy()
-        
-        # 应用省市筛选
-        if filters.get("province") and filters["province"] != "全部":
-            filtered_df = filtered_df[filtered_df["省"] == filters["province"]]
-        if filters.get("city") and filters["city"] != "全部":
-            filtered_df = filtered_df[filtered_df["市"] == filters["city"]]
-        
-        # 应用上传人筛选
-        if filters.get("uploader") and filters["uploader"] != "全部" and "上传人姓名" in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df["上传人姓名"] == filters["uploader"]]
-        
-        # 应用日期筛选
-        if "日期" in filtered_df.columns and filters.get("start_date") and filters.get("end_date"):
-            filtered_df = filtered_df[
-                (filtered_df["日期"] >= pd.Timestamp(filters["start_date"])) &
-                (filtered_df["日期"] <= pd.Timestamp(filters["end_date"]))
-            ]
+        """处理趋势数据筛选（日期范围二分定位，省市上传人按编码比较）"""
+        filtered_df = DateRangeIndex.for_dataframe(df).select(
+            filters.get("province"),
+            filters.get("city"),
+            filters.get("uploader"),
+            filters.get("start_date"),
+            filters.get("end_date"),
+        )
         
         return filtered_df
     
@@ -35,11 +29,8 @@ class DataProcessingService:
         if "上传人姓名" not in df.columns or "完成" not in df.columns or "通过" not in df.columns:
             return pd.DataFrame()
         
-        df = df.copy()
-        df["完成+通过"] = df["完成"] + df["通过"]
-        
-        # 按上传人计算平均值
-        uploader_avg = df.groupby("上传人姓名")["完成+通过"].mean().reset_index()
+        # 按上传人计算平均值（完成+通过按需计算，不复制数据集）
+        uploader_avg = TaskCubeService.rollup_mean(df, "上传人姓名")
         uploader_avg = uploader_avg.sort_values("完成+通过", ascending=False).head(top_n)
         uploader_avg["排名"] = range(1, len(uploader_avg) + 1)
         
@@ -51,23 +42,17 @@ class DataProcessingService:
         if "完成" not in df.columns or "通过" not in df.columns:
             return pd.DataFrame()
         
-        df = df.copy()
-        df["完成+通过"] = df["完成"] + df["通过"]
-        
         if "市" in df.columns:
-            # 按城市和日期计算平均值
-            cities = df["市"].dropna().unique()
+            # 按城市和日期计算平均值，城市过多时只保留最先出现的几个城市的分组结果
+            avg_df = TaskCubeService.rollup_mean(df, ["市", "日期"])
+            cities = TaskCubeService.first_appearance(df, "市")
             if len(cities) > max_cities:
                 main_cities = cities[:max_cities]
-                city_df = df[df["市"].isin(main_cities)]
-            else:
-                city_df = df
-            
-            avg_df = city_df.groupby(["市", "日期"])["完成+通过"].mean().reset_index()
+                avg_df = avg_df[avg_df["市"].isin(main_cities)].reset_index(drop=True)
             return avg_df
         else:
             # 按日期计算平均值
-            avg_df = df.groupby("日期")["完成+通过"].mean().reset_index()
+            avg_df = TaskCubeService.rollup_mean(df, "日期")
             return avg_df
     
     @staticmethod
@@ -85,45 +70,285 @@ class DataProcessingService:
         return trend_summary
 
 
-class FilterService:
-    """筛选器服务"""
+class TaskCubeService:
+    """工单聚合立方体服务
+    
+    数据处理完成后按 省/市/上传人/日期 预聚合一次，保存各状态数量之和与记录数；
+    页面筛选和图表统计在立方体上切片、上卷，不再重复扫描明细数据。
+    """
+    
+    DIMENSIONS = ["省", "市", "上传人姓名", "日期"]
+    COUNT_COLUMN = "记录数"
+    # 分组在明细数据中首次出现的顺序（立方体按日期排序后仍可还原明细的出现顺序）
+    ORDER_COLUMN = "首次出现"
     
     @staticmethod
-    def get_filter_options(df, current_filters: dict) -> dict:
-        """获取筛选器选项"""
-        options = {}
+    def build_cube(df) -> pd.DataFrame:
+        """构建聚合立方体（保留缺失值，按日期排序以便日期范围二分定位）"""
+        dims = [col for col in TaskCubeService.DIMENSIONS if col in df.columns]
+        status_cols = [col for col in TASK_STATUS_COLUMNS if col in df.columns]
+        if not dims:
+            return df
         
-        # 省份选项
-        options["provinces"] = ["全部"] + sorted(df["省"].dropna().unique()) if "省" in df.columns else ["全部"]
+        source = df[dims + status_cols].assign(**{TaskCubeService.COUNT_COLUMN: 1})
+        if "日期" in dims:
+            source["日期"] = pd.to_datetime(source["日期"], errors="coerce")
         
-        # 城市选项
-        if current_filters.get("province") and current_filters["province"] != "全部" and "市" in df.columns:
-            options["cities"] = ["全部"] + sorted(
-                df[df["省"] == current_filters["province"]]["市"].dropna().unique()
-            )
-        else:
-            options["cities"] = ["全部"] + sorted(df["市"].dropna().unique()) if "市" in df.columns else ["全部"]
-        
-        # 上传人选项
-        if "上传人姓名" in df.columns:
-            if current_filters.get("province") and current_filters["province"] != "全部":
-                uploaders = ["全部"] + sorted(
-                    df[
-                        (df["省"] == current_filters["province"]) &
-                        (df["市"] == current_filters["city"] if current_filters.get("city") != "全部" else True)
-                    ]["上传人姓名"].dropna().unique()
-                )
-            elif current_filters.get("city") and current_filters["city"] != "全部":
-                uploaders = ["全部"] + sorted(
-                    df[df["市"] == current_filters["city"]]["上传人姓名"].dropna().unique()
+        cube = (
+            source.groupby(dims, dropna=False, sort=False)[
+                status_cols + [TaskCubeService.COUNT_COLUMN]
+            ]
+            .sum()
+            .reset_index()
+        )
+        cube[TaskCubeService.ORDER_COLUMN] = np.arange(len(cube))
+        if "日期" in dims:
+            cube = cube.sort_values("日期", kind="stable", ignore_index=True)
+        return cube
+    
+    @staticmethod
+    def first_appearance(df, key: str) -> np.ndarray:
+        """按在明细数据中首次出现的顺序返回某一维度的取值（不含缺失值）"""
+        if TaskCubeService.ORDER_COLUMN not in df.columns:
+            return df[key].dropna().unique()
+        order = df.groupby(key, sort=False)[TaskCubeService.ORDER_COLUMN].min()
+        return order.sort_values(kind="stable").index.to_numpy()
+    
+    @staticmethod
+    def completed(df) -> pd.Series:
+        """完成+通过（按需计算，不写回数据集）"""
+        return (df["完成"] + df["通过"]).rename("完成+通过")
+    
+    @staticmethod
+    def rollup_mean(df, keys, values: Optional[pd.Series] = None) -> pd.DataFrame:
+        """按分组计算平均值（默认为完成+通过）
+        
+        立方体数据按记录数加权，结果与逐行求平均一致。
+        """
+        if values is None:
+            values = TaskCubeService.completed(df)
+        by = [df[key] for key in (keys if isinstance(keys, list) else [keys])]
+        
+        if TaskCubeService.COUNT_COLUMN not in df.columns:
+            return values.groupby(by).mean().reset_index()
+        
+        count_col = TaskCubeService.COUNT_COLUMN
+        sums = pd.DataFrame({"value": values, count_col: df[count_col]}).groupby(by).sum()
+        avg = sums["value"] / sums[count_col]
+        return avg.rename(values.name).reset_index()
+
+
+def _cached_for_dataframe(instances: Dict[int, tuple], df, factory: Callable):
+    """按DataFrame对象缓存派生索引，数据集释放后自动清除"""
+    key = id(df)
+    cached = instances.get(key)
+    if cached is not None and cached[0]() is df:
+        return cached[1]
+    
+    index = factory(df)
+    instances[key] = (
+        weakref.ref(df, lambda _, key=key: instances.pop(key, None)),
+        index,
+    )
+    return index
+
+
+class FilterIndex:
+    """省→市→上传人 层级筛选索引
+    
+    每个数据集只扫描一次，预先生成各级下拉选项；筛选器联动时直接查表。
+    """
+    
+    ALL = "全部"
+    _instances: Dict[int, tuple] = {}
+    
+    def __init__(self, df):
+        self.has_province = "省" in df.columns
+        self.has_city = "市" in df.columns
+        self.has_uploader = "上传人姓名" in df.columns
+        
+        # 省/市/上传人的取值组合，远小于原始数据
+        level_cols = [col for col in ["省", "市", "上传人姓名"] if col in df.columns]
+        combos = df[level_cols].drop_duplicates()
+        
+        self.provinces = self._options(combos, "省")
+        self.cities = self._options(combos, "市")
+        self.uploaders = self._options(combos, "上传人姓名")
+        
+        self.cities_by_province = self._grouped_options(combos, "省", "市")
+        self.uploaders_by_province = self._grouped_options(combos, "省", "上传人姓名")
+        self.uploaders_by_city = self._grouped_options(combos, "市", "上传人姓名")
+        self.uploaders_by_province_city = self._grouped_options(
+            combos, ["省", "市"], "上传人姓名"
+        )
+    
+    @classmethod
+    def _options(cls, combos, col) -> list:
+        """生成带“全部”的选项列表"""
+        if col not in combos.columns:
+            return [cls.ALL]
+        return [cls.ALL] + sorted(combos[col].dropna().unique())
+    
+    @classmethod
+    def _grouped_options(cls, combos, keys, col) -> dict:
+        """按上级取值分组生成选项列表"""
+        key_cols = keys if isinstance(keys, list) else [keys]
+        if any(key not in combos.columns for key in key_cols + [col]):
+            return {}
+        return {
+            key: [cls.ALL] + sorted(values.dropna().unique())
+            for key, values in combos.groupby(keys)[col]
+        }
+    
+    @classmethod
+    def for_dataframe(cls, df) -> "FilterIndex":
+        """获取数据集对应的筛选索引（同一数据集只构建一次）"""
+        return _cached_for_dataframe(cls._instances, df, cls)
+    
+    def province_options(self) -> list:
+        """省份选项"""
+        return self.provinces
+    
+    def city_options(self, province: Optional[str] = None) -> list:
+        """城市选项，选择省份时只列出该省的城市"""
+        if province and province != self.ALL and self.has_city:
+            return self.cities_by_province.get(province, [self.ALL])
+        return self.cities
+    
+    def uploader_options(
+        self, province: Optional[str] = None, city: Optional[str] = None
+    ) -> list:
+        """上传人选项，按已选的省份/城市收窄"""
+        if not self.has_uploader:
+            return [self.ALL]
+        if province and province != self.ALL:
+            if city and city != self.ALL:
+                return self.uploaders_by_province_city.get(
+                    (province, city), [self.ALL]
                 )
-            else:
-                uploaders = ["全部"] + sorted(df["上传人姓名"].dropna().unique())
-            options["uploaders"] = uploaders
-        else:
-            options["uploaders"] = ["全部"]
+            return self.uploaders_by_province.get(province, [self.ALL])
+        if city and city != self.ALL:
+            return self.uploaders_by_city.get(city, [self.ALL])
+        return self.uploaders
+
+
+class DateRangeIndex:
+    """日期有序行索引
+    
+    数据集按日期稳定排序一次，任意日期范围通过二分查找定位为连续切片；
+    省/市/上传人预先编码为整数，其余筛选条件只在切片内比较编码。
+    """
+    
+    ALL = "全部"
+    CODE_COLUMNS = ["省", "市", "上传人姓名"]
+    _instances: Dict[int, tuple] = {}
+    
+    def __init__(self, df, date_col: str = "日期"):
+        self.dates = None
+        self.valid_count = len(df)
+        self._frame_ref = weakref.ref(df)
+        self._sorted_frame = None
+        
+        if date_col in df.columns:
+            dates = pd.to_datetime(df[date_col], errors="coerce").to_numpy()
+            valid = ~np.isnat(dates)
+            self.valid_count = int(valid.sum())
+            # 稳定排序，无效日期排在末尾；数据已按日期排序时不复制
+            is_sorted = (
+                valid[: self.valid_count].all()
+                and pd.Index(dates[: self.valid_count]).is_monotonic_increasing
+            )
+            if not is_sorted:
+                order = np.argsort(dates, kind="stable")
+                df = self._sorted_frame = df.take(order)
+                dates = dates[order]
+            self.dates = dates
+        
+        # 省/市/上传人编码，缺失值编码为-1
+        self.codes = {}
+        self.code_lookup = {}
+        for col in self.CODE_COLUMNS:
+            if col in df.columns:
+                codes, uniques = pd.factorize(df[col])
+                self.codes[col] = codes
+                self.code_lookup[col] = {
+                    value: code for code, value in enumerate(uniques)
+                }
+    
+    @property
+    def frame(self) -> pd.DataFrame:
+        """按日期排序的数据（原数据已有序时直接引用原数据）"""
+        if self._sorted_frame is not None:
+            return self._sorted_frame
+        return self._frame_ref()
+    
+    @classmethod
+    def for_dataframe(cls, df) -> "DateRangeIndex":
+        """获取数据集对应的日期索引（同一数据集只构建一次）"""
+        return _cached_for_dataframe(cls._instances, df, cls)
+    
+    def date_slice(
+        self, start_date=None, end_date=None, whole_days: bool = False
+    ) -> slice:
+        """二分查找日期范围对应的行切片
+        
+        whole_days为True时按自然日比较，结束日期当天的所有时刻都包含在内。
+        """
+        if self.dates is None or not start_date or not end_date:
+            return slice(0, None)
+        
+        dates = self.dates[: self.valid_count]
+        start = pd.Timestamp(start_date)
+        end = pd.Timestamp(end_date)
+        if whole_days:
+            start = start.normalize()
+            end = end.normalize() + pd.Timedelta(days=1)
+        
+        lower = np.searchsorted(dates, start.to_datetime64(), side="left")
+        upper = np.searchsorted(
+            dates, end.to_datetime64(), side="left" if whole_days else "right"
+        )
+        return slice(int(lower), int(max(lower, upper)))
+    
+    def select(
+        self,
+        province: Optional[str] = None,
+        city: Optional[str] = None,
+        uploader: Optional[str] = None,
+        start_date=None,
+        end_date=None,
+        whole_days: bool = False,
+    ) -> pd.DataFrame:
+        """按省/市/上传人和日期范围筛选，返回按日期排序的数据"""
+        rows = self.date_slice(start_date, end_date, whole_days)
+        
+        mask = None
+        for col, value in (("省", province), ("市", city), ("上传人姓名", uploader)):
+            if not value or value == self.ALL or col not in self.codes:
+                continue
+            code = self.code_lookup[col].get(value, -2)
+            col_mask = self.codes[col][rows] == code
+            mask = col_mask if mask is None else mask & col_mask
+        
+        selection = self.frame.iloc[rows]
+        return selection if mask is None else selection[mask]
+
+
+class FilterService:
+    """筛选器服务"""
+    
+    @staticmethod
+    def get_filter_options(df, current_filters: dict) -> dict:
+        """获取筛选器选项（查询缓存的层级筛选索引）"""
+        index = FilterIndex.for_dataframe(df)
+        province = current_filters.get("province")
+        city = current_filters.get("city")
         
-        return options
+        return {
+            "provinces": index.province_options(),
+            "cities": index.city_options(province),
+            "uploaders": index.uploader_options(province, city),
+        }
 
 
 class DataValidationService:
@@ -0,0 +1,185 @@
+import hashlib
+import io
+import json
+import os
+import threading
+import uuid
+from typing import Any, Optional
+
+import pandas as pd
+
+from config import CACHE_CONFIG
+
+
+def read_source_bytes(source) -> bytes:
+    """读取文件内容，支持文件路径、上传文件对象和字节串"""
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    if hasattr(source, "read"):
+        position = source.tell()
+        source.seek(0)
+        data = source.read()
+        source.seek(position)
+        return data
+    with open(source, "rb") as f:
+        return f.read()
+
+
+def content_hash(data: bytes) -> str:
+    """计算文件内容哈希"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class ExcelParseCache:
+    """Excel解析缓存
+
+    以文件内容哈希和读取参数为键，将解析后的DataFrame以Parquet列式格式
+    保存在磁盘上；缓存目录超过容量上限时按最近访问时间（LRU）淘汰。
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, enabled: bool = True):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+
+    def make_key(self, digest: str, options: dict) -> str:
+        """生成缓存键（内容哈希 + 读取参数）"""
+        options_text = json.dumps(
+            options, sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(f"{digest}|{options_text}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.parquet")
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """读取缓存，未命中返回None"""
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            df = pd.read_parquet(path)
+            # 更新访问时间，用于LRU淘汰
+            os.utime(path)
+            return df
+        except Exception:
+            # 缓存文件损坏或缺少Parquet依赖时视为未命中
+            return None
+
+    def put(self, key: str, df: pd.DataFrame) -> bool:
+        """写入缓存，无法以Parquet保存的数据（如混合类型列）直接跳过"""
+        path = self._path(key)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            df.to_parquet(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+        self.evict()
+        return True
+
+    def evict(self):
+        """按最近访问时间淘汰缓存文件，直到总大小不超过上限"""
+        with self._lock:
+            if not os.path.isdir(self.cache_dir):
+                return
+
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith(".parquet"):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total_size = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total_size <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total_size -= size
+                except OSError:
+                    continue
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            if not os.path.isdir(self.cache_dir):
+                return
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".parquet"):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+    def read_excel(
+        self, source, key_options: Optional[dict] = None, **options: Any
+    ) -> pd.DataFrame:
+        """读取Excel，命中缓存时跳过解析
+
+        key_options用于替代无法稳定序列化的读取参数（如usecols回调）生成缓存键。
+        """
+        data = read_source_bytes(source)
+
+        if not self.enabled:
+            return pd.read_excel(io.BytesIO(data), engine="calamine", **options)
+
+        key = self.make_key(
+            content_hash(data), options if key_options is None else key_options
+        )
+        df = self.get(key)
+        if df is None:
+            df = pd.read_excel(io.BytesIO(data), engine="calamine", **options)
+            self.put(key, df)
+        return df
+
+
+# 全局解析缓存实例
+excel_parse_cache = ExcelParseCache(
+    cache_dir=CACHE_CONFIG["parse_cache_dir"],
+    max_bytes=int(CACHE_CONFIG["parse_cache_max_mb"] * 1024 * 1024),
+    enabled=CACHE_CONFIG["parse_cache_enabled"],
+)
+
+
+def read_excel_cached(source, **options: Any) -> pd.DataFrame:
+    """使用全局解析缓存读取Excel"""
+    return excel_parse_cache.read_excel(source, **options)
+
+
+def read_excel_with_schema(source, schema: dict) -> pd.DataFrame:
+    """按文件结构定义读取Excel：只解析声明的列，并在读取时完成类型转换
+
+    keep_all_columns为True时不裁剪列，未声明的列原样保留。
+    """
+    required_columns = schema.get("required_columns", [])
+    optional_columns = schema.get("optional_columns", [])
+    columns = list(dict.fromkeys(required_columns + optional_columns))
+
+    options = {"header": schema.get("header", 0)}
+    if columns and not schema.get("keep_all_columns"):
+        # 回调形式可容忍可选列缺失，列名比较时去除首尾空格
+        wanted = set(columns)
+        options["usecols"] = lambda name: str(name).strip() in wanted
+    if schema.get("dtypes"):
+        options["dtype"] = schema["dtypes"]
+    if schema.get("date_columns"):
+        options["parse_dates"] = schema["date_columns"]
+
+    df = excel_parse_cache.read_excel(source, key_options=schema, **options)
+
+    present_columns = {str(col).strip() for col in df.columns}
+    missing_cols = [col for col in required_columns if col not in present_columns]
+    if missing_cols:
+        raise ValueError(f"缺少必需的列: {missing_cols}")
+
+    return df
@@ -0,0 +1,94 @@
+import functools
+import hashlib
+import json
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+import plotly.graph_objects as go
+
+from config import CACHE_CONFIG
+from .data_services import _cached_for_dataframe
+from .result_cache import ResultCache
+
+# 数据集指纹：按DataFrame对象缓存，同一数据集只哈希一次（数据集视为不可变）
+_fingerprints: Dict[int, tuple] = {}
+
+
+def _compute_fingerprint(df: pd.DataFrame) -> str:
+    """计算数据集指纹（列名、列类型和逐行内容哈希）"""
+    digest = hashlib.sha256()
+    schema = [[str(col), str(dtype)] for col, dtype in df.dtypes.items()]
+    digest.update(json.dumps(schema, ensure_ascii=False).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def dataframe_fingerprint(df) -> Optional[str]:
+    """获取数据集指纹，非DataFrame或包含不可哈希的值时返回None
+
+    指纹按对象缓存，原地修改后的数据集仍返回修改前的指纹；需要修改的数据集
+    应先复制（copy(deep=False)即可）再修改，或修改后不再用于图表缓存。
+    """
+    if not isinstance(df, pd.DataFrame):
+        return None
+    try:
+        return _cached_for_dataframe(_fingerprints, df, _compute_fingerprint)
+    except TypeError:
+        return None
+
+
+def _dump(result: Any) -> Any:
+    """序列化图表函数的返回值：图表保存为JSON，其他值（错误信息等）原样保存"""
+    if isinstance(result, go.Figure):
+        return ("figure", result.to_json())
+    if isinstance(result, tuple):
+        return ("tuple", tuple(_dump(item) for item in result))
+    return ("value", result)
+
+
+def _load(payload: Any) -> Any:
+    """还原序列化的返回值，每次返回新的图表对象"""
+    kind, value = payload
+    if kind == "figure":
+        return go.Figure(json.loads(value))
+    if kind == "tuple":
+        return tuple(_load(item) for item in value)
+    return value
+
+
+# 全局图表缓存实例（同一服务进程内所有会话共用）
+figure_cache = ResultCache(
+    max_bytes=int(CACHE_CONFIG["figure_cache_max_mb"] * 1024 * 1024),
+    enabled=CACHE_CONFIG["figure_cache_enabled"],
+)
+FIGURE_CACHE_MIN_ROWS = CACHE_CONFIG["figure_cache_min_rows"]
+
+
+def cached_figure(builder: Callable) -> Callable:
+    """图表函数缓存装饰器
+
+    以输入数据集（第一个参数）的指纹和其余图表参数为键，命中时直接还原
+    已序列化的图表，跳过分组统计和图形构建；小数据集直接绘制。
+    输入数据集须视为不可变：指纹按对象缓存，原地修改不会使缓存的图表失效。
+    只用于输入可能较大的图表（行数不少于FIGURE_CACHE_MIN_ROWS时才缓存）。
+    """
+    name = f"{builder.__module__}.{builder.__qualname__}"
+
+    @functools.wraps(builder)
+    def wrapper(df, *args, **kwargs):
+        fingerprint = None
+        if figure_cache.enabled and len(df) >= FIGURE_CACHE_MIN_ROWS:
+            fingerprint = dataframe_fingerprint(df)
+        if fingerprint is None:
+            return builder(df, *args, **kwargs)
+
+        key = figure_cache.make_key(name, fingerprint, args, kwargs)
+        payload = figure_cache.get(key)
+        if payload is not None:
+            return _load(payload)
+
+        result = builder(df, *args, **kwargs)
+        figure_cache.put(key, _dump(result))
+        return result
+
+    return wrapper
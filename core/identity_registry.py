@@ -0,0 +1,102 @@
+import sys
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+class IdentityRegistry:
+    """标识驻留表：账号、UUID、身份证号等标识规范化后分配整数编码，在各表间共享
+
+    每个不同的原始值只转换为字符串并去除空格一次，相同标识在人员、员工、
+    车辆和工单表中得到相同的编码，映射和关联均在整数上完成。缺失值编码为-1。
+
+    以已有驻留表为base创建的叠加表沿用base中标识的编码，新标识只登记在叠加表中，
+    编码排在base之后；base此后只读，可作为流程结果缓存并被多次运行共享。
+    """
+
+    MISSING = -1
+
+    def __init__(self, base: Optional["IdentityRegistry"] = None):
+        self._base = base
+        self._offset = len(base) if base is not None else 0
+        if base is not None:
+            base.read_only = True
+        self.read_only = False
+        # 本表登记的标识，位置加上base的长度即编码
+        self._index = pd.Index([], dtype="str")
+
+    def __len__(self) -> int:
+        return self._offset + len(self._index)
+
+    def __sizeof__(self) -> int:
+        # base由其所有者计入
+        return object.__sizeof__(self) + self._index.memory_usage(deep=True)
+
+    def _find(self, normalized: pd.Index) -> np.ndarray:
+        """已登记标识的编码，未登记的为MISSING"""
+        codes = self._index.get_indexer(normalized)
+        codes = np.where(codes >= 0, codes + self._offset, self.MISSING)
+        if self._base is not None:
+            missing = codes == self.MISSING
+            if missing.any():
+                codes[missing] = self._base._find(normalized[missing])
+        return codes
+
+    def encode(self, values) -> np.ndarray:
+        """将标识列转换为整数编码"""
+        positions, uniques = pd.factorize(pd.Series(values, copy=False))
+        normalized = pd.Index(uniques).astype(str).str.strip()
+
+        codes = self._find(normalized)
+        new = codes == self.MISSING
+        if new.any():
+            if self.read_only:
+                raise ValueError("只读的标识驻留表不能登记新标识")
+            self._index = self._index.append(normalized[new].unique())
+            codes[new] = self._index.get_indexer(normalized[new]) + self._offset
+
+        # 末位对应缺失值，factorize返回的-1直接取到MISSING
+        return np.append(codes, self.MISSING)[positions]
+
+    def decode(self, codes: np.ndarray) -> pd.api.extensions.ExtensionArray:
+        """将整数编码还原为规范化后的标识，-1还原为缺失值"""
+        codes = np.asarray(codes)
+        if self._base is None:
+            return self._index.array.take(codes, allow_fill=True)
+
+        local = codes >= self._offset
+        values = self._base.decode(np.where(local, self.MISSING, codes))
+        if local.any():
+            values[local] = self._index.array.take(codes[local] - self._offset)
+        return values
+
+
+class CodeMapping:
+    """整数编码 -> 值 的映射，重复编码保留最后一条（与字典映射一致）"""
+
+    def __init__(self, codes: np.ndarray, values):
+        codes = np.asarray(codes)
+        values = np.asarray(values)
+        keep = (codes != IdentityRegistry.MISSING) & ~pd.Index(codes).duplicated(
+            keep="last"
+        )
+        self._index = pd.Index(codes[keep])
+        self._values = values[keep]
+
+    def __sizeof__(self) -> int:
+        return (
+            object.__sizeof__(self)
+            + self._index.memory_usage(deep=True)
+            + sys.getsizeof(self._values)
+        )
+
+    def lookup(self, codes: np.ndarray, missing) -> np.ndarray:
+        """按编码取值，未找到的编码返回missing"""
+        positions = self._index.get_indexer(codes)
+        found = positions >= 0
+        if not len(self._values):
+            return np.full(len(positions), missing, dtype=self._values.dtype)
+        return np.where(
+            found, self._values.take(np.where(found, positions, 0)), missing
+        )
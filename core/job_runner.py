@@ -0,0 +1,108 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from config import PIPELINE_CONFIG
+
+
+class Job:
+    """后台任务：记录当前阶段、结果和异常信息"""
+
+    def __init__(self, job_id: str, stages: List[str]):
+        self.id = job_id
+        self.stages = stages
+        self.current = 0
+        self.label = "等待执行"
+        self.status = "pending"
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def total(self) -> int:
+        return len(self.stages)
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def report(self, stage: str):
+        """进入指定阶段（此前的阶段视为已完成）"""
+        with self._lock:
+            if stage in self.stages:
+                self.current = self.stages.index(stage)
+            self.label = stage
+
+    def _run(self, fn: Callable, args: tuple, kwargs: dict):
+        self.status = "running"
+        try:
+            self.result = fn(*args, progress=self.report, **kwargs)
+            with self._lock:
+                self.current = self.total
+                self.label = "处理完成"
+            self.status = "done"
+        except Exception as e:
+            self.error = e
+            self.label = "处理失败"
+            self.status = "failed"
+        finally:
+            self.finished_at = time.time()
+
+
+class JobRunner:
+    """后台任务执行器
+
+    任务提交到进程内共享的工作线程池执行，不阻塞页面脚本；会话只保存任务ID，
+    页面重新运行后仍可查询进度并在完成时取回结果。
+    """
+
+    def __init__(self, max_workers: int, retention_seconds: float = 3600):
+        self.retention_seconds = retention_seconds
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="job"
+        )
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable, stages: List[str], *args, **kwargs) -> Job:
+        """提交任务，fn需接受progress回调参数用于报告阶段"""
+        self._cleanup()
+        job = Job(uuid.uuid4().hex, stages)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._executor.submit(job._run, fn, args, kwargs)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """按ID查询任务"""
+        self._cleanup()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def pop(self, job_id: str) -> Optional[Job]:
+        """取出任务并不再保留，会话保存结果后调用以及时释放结果占用的内存"""
+        with self._lock:
+            return self._jobs.pop(job_id, None)
+
+    def _cleanup(self):
+        """清除超过保留时间的已结束任务"""
+        now = time.time()
+        with self._lock:
+            expired = [
+                job_id
+                for job_id, job in self._jobs.items()
+                if job.finished_at is not None
+                and now - job.finished_at > self.retention_seconds
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+
+# 全局任务执行器（同一服务进程内所有会话共用）
+job_runner = JobRunner(
+    max_workers=PIPELINE_CONFIG["job_workers"],
+    retention_seconds=PIPELINE_CONFIG["job_retention_seconds"],
+)
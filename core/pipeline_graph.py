@@ -0,0 +1,176 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from .result_cache import ResultCache
+
+
+class PipelineNode:
+    """流程节点：由依赖（输入或其他节点）的结果计算本节点结果"""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        deps: Sequence[str],
+        stage: Optional[str] = None,
+    ):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.stage = stage
+
+
+class PipelineRun:
+    """一次流程运行的结果，以及各节点的耗时和缓存状态"""
+
+    def __init__(self):
+        self.results: Dict[str, Any] = {}
+        self.nodes: List[Dict[str, Any]] = []
+
+    def record(self, node: str, stage: Optional[str], status: str, seconds: float):
+        """记录节点状态：computed 重新计算，cached 取自缓存，loaded 读取输入"""
+        self.nodes.append(
+            {
+                "node": node,
+                "stage": stage,
+                "status": status,
+                "seconds": round(seconds, 6),
+            }
+        )
+
+
+class PipelineGraph:
+    """按依赖关系惰性执行的处理流程
+
+    节点结果以 流程名+节点名+依赖的缓存键 为键写入结果缓存，输入的缓存键为其内容指纹；
+    只计算目标节点用到且缓存未命中的节点，替换某个输入只会重新计算它的下游节点。
+    """
+
+    def __init__(
+        self, name: str, inputs: Sequence[str], input_stage: Optional[str] = None
+    ):
+        self.name = name
+        self.inputs = list(inputs)
+        self.input_stage = input_stage
+        self._nodes: "OrderedDict[str, PipelineNode]" = OrderedDict()
+
+    def add_node(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        deps: Sequence[str],
+        stage: Optional[str] = None,
+    ):
+        """添加节点，依赖须为输入或已添加的节点（添加顺序即拓扑顺序）"""
+        for dep in deps:
+            if dep not in self.inputs and dep not in self._nodes:
+                raise ValueError(f"节点 {name} 的依赖 {dep} 未定义")
+        self._nodes[name] = PipelineNode(name, func, deps, stage)
+
+    def node_keys(self, fingerprints: Dict[str, str]) -> Dict[str, str]:
+        """由输入指纹沿依赖关系生成各节点的缓存键"""
+        keys = {name: fingerprints[name] for name in self.inputs}
+        for name, node in self._nodes.items():
+            keys[name] = ResultCache.make_key(
+                self.name, name, [keys[dep] for dep in node.deps]
+            )
+        return keys
+
+    def plan(
+        self,
+        targets: Iterable[str],
+        keys: Dict[str, str],
+        cache: Optional[ResultCache] = None,
+    ) -> List[str]:
+        """需要计算的节点（按执行顺序）：目标节点用到且缓存中没有的节点"""
+        stale = []
+        visited = set()
+
+        def visit(name: str):
+            if name in visited or name in self.inputs:
+                return
+            visited.add(name)
+            if cache is not None and cache.enabled and keys[name] in cache:
+                return
+            for dep in self._nodes[name].deps:
+                visit(dep)
+            stale.append(name)
+
+        for target in targets:
+            visit(target)
+        return stale
+
+    def required_inputs(self, nodes: Iterable[str]) -> List[str]:
+        """节点直接依赖的输入"""
+        needed = {dep for name in nodes for dep in self._nodes[name].deps}
+        return [name for name in self.inputs if name in needed]
+
+    def run(
+        self,
+        targets: Sequence[str],
+        fingerprints: Dict[str, str],
+        load_inputs: Callable[[List[str]], Dict[str, Any]],
+        cache: Optional[ResultCache] = None,
+        progress: Optional[Callable[[str], None]] = None,
+    ) -> PipelineRun:
+        """计算目标节点
+
+        load_inputs按输入名列表返回 {输入名: 值}，只会读取需要重新计算的节点用到的输入；
+        progress回调在开始计算每个节点时以节点的阶段名调用。
+        """
+        report = progress or (lambda stage: None)
+        keys = self.node_keys(fingerprints)
+        run = PipelineRun()
+        values: Dict[str, Any] = {}
+
+        def load(names: List[str]):
+            names = [name for name in names if name not in values]
+            if not names:
+                return
+            if self.input_stage:
+                report(self.input_stage)
+            start = time.perf_counter()
+            values.update(load_inputs(names))
+            run.record(
+                "+".join(names),
+                self.input_stage,
+                "loaded",
+                time.perf_counter() - start,
+            )
+
+        def evaluate(name: str) -> Any:
+            if name in values:
+                return values[name]
+            if name in self.inputs:
+                load([name])
+                return values[name]
+
+            node = self._nodes[name]
+            elapsed = []
+
+            def compute():
+                args = [evaluate(dep) for dep in node.deps]
+                if node.stage:
+                    report(node.stage)
+                start = time.perf_counter()
+                value = node.func(*args)
+                elapsed.append(time.perf_counter() - start)
+                return value
+
+            if cache is not None:
+                value = cache.get_or_compute(keys[name], compute)
+            else:
+                value = compute()
+
+            if elapsed:
+                run.record(name, node.stage, "computed", elapsed[0])
+            else:
+                run.record(name, node.stage, "cached", 0.0)
+            values[name] = value
+            return value
+
+        # 先一次性读取需要的输入（可并行解析），缓存在此期间被淘汰时再按需读取
+        load(self.required_inputs(self.plan(targets, keys, cache)))
+        run.results = {target: evaluate(target) for target in targets}
+        return run
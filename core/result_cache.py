@@ -0,0 +1,141 @@
+import hashlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+
+from config import CACHE_CONFIG
+
+
+def estimate_size(value: Any) -> int:
+    """估算缓存对象占用的内存（字节）"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def _share(value: Any) -> Any:
+    """返回共享对象的浅拷贝，调用方增删列不会影响缓存中的数据"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    if isinstance(value, tuple):
+        return tuple(_share(item) for item in value)
+    if isinstance(value, list):
+        return [_share(item) for item in value]
+    if isinstance(value, dict):
+        return {k: _share(v) for k, v in value.items()}
+    return value
+
+
+class ResultCache:
+    """进程级共享结果缓存
+
+    以输入文件内容哈希和核查配置为键，在同一服务进程的所有会话间共享处理结果；
+    总内存超过上限时按最近使用时间（LRU）淘汰，并记录命中/未命中次数。
+    """
+
+    def __init__(self, max_bytes: int, enabled: bool = True):
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """生成缓存键（内容哈希、配置等）"""
+        text = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取缓存，未命中返回None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return _share(entry[0])
+
+    def __contains__(self, key: str) -> bool:
+        """是否已缓存（不计入命中统计）"""
+        with self._lock:
+            return key in self._entries
+
+    def put(self, key: str, value: Any) -> bool:
+        """写入缓存，超过内存上限时淘汰最久未使用的结果"""
+        if not self.enabled:
+            return False
+
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return False
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            self._entries[key] = (_share(value), size)
+            self._size += size
+
+            while self._size > self.max_bytes and self._entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+        return True
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """读取缓存，未命中时计算并写入；同一键并发请求只计算一次"""
+        if not self.enabled:
+            return compute()
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            value = self.get(key)
+            if value is None:
+                value = compute()
+                self.put(key, value)
+
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计信息"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "size_bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+# 全局共享结果缓存实例（同一服务进程内所有会话共用）
+shared_result_cache = ResultCache(
+    max_bytes=int(CACHE_CONFIG["result_cache_max_mb"] * 1024 * 1024),
+    enabled=CACHE_CONFIG["result_cache_enabled"],
+)
@@ -1,114 +1,292 @@
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
 import pandas as pd
 
+from config import FILE_SCHEMAS, PIPELINE_CONFIG
+from .excel_cache import content_hash, read_excel_with_schema, read_source_bytes
+from .identity_registry import CodeMapping, IdentityRegistry
+from .pipeline_graph import PipelineGraph
+from .result_cache import shared_result_cache
+
+
+# 任务进展状态列
+TASK_STATUS_COLUMNS = ["待执行", "完成", "通过", "未知"]
+
+# 任务状态 -> 任务进展（未列出的状态为"未知"）
+TASK_STATUS_MAPPING = {
+    "测试中": "待执行",
+    "待执行": "待执行",
+    "第三方上传完成": "完成",
+    "分析失败": "完成",
+    "分析中": "完成",
+    "评审不通过": "完成",
+    "评审中": "完成",
+    "审核不通过": "完成",
+    "审核通过": "通过",
+    "已分配": "待执行",
+    "已关闭": "通过",
+    "已接纳": "待执行",
+    "已开始": "待执行",
+    "已完成": "通过",
+    "已指派": "待执行",
+    "执行中": "待执行",
+}
+
+# 工单分析流程各阶段（用于进度报告）
+TASK_PIPELINE_STAGES = [
+    "解析输入文件",
+    "合并人员信息",
+    "处理车辆出勤记录",
+    "处理任务进展",
+    "合并车辆和任务数据",
+]
+
+
+def read_input_file(source, kind: str) -> pd.DataFrame:
+    """按文件结构定义读取输入文件，已解析的DataFrame直接复用"""
+    if isinstance(source, pd.DataFrame):
+        return source.copy(deep=False)
+    return read_excel_with_schema(source, FILE_SCHEMAS[kind])
+
+
+def _read_input_bytes(data: bytes, kind: str) -> pd.DataFrame:
+    """在工作线程/进程中解析文件内容"""
+    return read_excel_with_schema(data, FILE_SCHEMAS[kind])
+
+
+def read_input_files(files: Dict[str, Any]) -> Dict[str, pd.DataFrame]:
+    """并行解析多个输入文件，返回 {文件类型: DataFrame}"""
+    frames = {
+        kind: source.copy(deep=False)
+        for kind, source in files.items()
+        if isinstance(source, pd.DataFrame)
+    }
+    pending = {kind: source for kind, source in files.items() if kind not in frames}
+    if not pending:
+        return frames
+
+    executor_class = (
+        ProcessPoolExecutor
+        if PIPELINE_CONFIG["ingest_executor"] == "process"
+        else ThreadPoolExecutor
+    )
+    max_workers = max(1, min(len(pending), PIPELINE_CONFIG["ingest_workers"]))
+    with executor_class(max_workers=max_workers) as executor:
+        futures = {
+            kind: executor.submit(_read_input_bytes, read_source_bytes(source), kind)
+            for kind, source in pending.items()
+        }
+        frames.update({kind: future.result() for kind, future in futures.items()})
+
+    return frames
+
+
+class EmployeeLookup:
+    """员工资源映射（IResource表），每次处理只解析一次并在各步骤间共享
+
+    映射的键和值均为identities中的标识编码。identities构建后只读（可作为流程结果缓存），
+    各处理步骤以它为base创建叠加表登记新标识，共有的标识在各表中编码一致。
+    """
+
+    def __init__(self, employee_df: pd.DataFrame):
+        self.identities = IdentityRegistry()
+
+        df = employee_df[["*资源姓名", "Uniportal账号", "*ID编码"]]
+        df = df.rename(
+            columns={"*资源姓名": "资源姓名", "*ID编码": "ID编码"}
+        ).drop_duplicates()
+
+        id_codes = self.identities.encode(df["ID编码"])
+        account_codes = self.identities.encode(df["Uniportal账号"])
+
+        # 映射：ID编码 -> Uniportal账号
+        self.id_to_account = CodeMapping(id_codes, account_codes)
+
+        # 映射：Uniportal账号 -> 资源姓名
+        self.account_to_name = CodeMapping(account_codes, df["资源姓名"])
+
+        self.identities.read_only = True
 
-def merge_personnel_files(personnel_file: str, employee_file: str) -> pd.DataFrame:
-    """合并人员信息"""
-    df1 = pd.read_excel(personnel_file, header=1, engine="calamine")
+    def __sizeof__(self) -> int:
+        return (
+            object.__sizeof__(self)
+            + sys.getsizeof(self.identities)
+            + sys.getsizeof(self.id_to_account)
+            + sys.getsizeof(self.account_to_name)
+        )
+
+
+def load_employee_lookup(employee_file) -> EmployeeLookup:
+    """读取员工资源文件并构建映射"""
+    if isinstance(employee_file, EmployeeLookup):
+        return employee_file
+    return EmployeeLookup(read_input_file(employee_file, "employee"))
+
+
+def merge_personnel_files(personnel_file: str, employee_file) -> pd.DataFrame:
+    """合并人员信息（employee_file可为文件或已构建的EmployeeLookup）"""
+    df1 = read_input_file(personnel_file, "personnel")
     df1 = df1[["u_uid", "员工编号", "员工姓名", "身份证号"]].drop_duplicates()
 
-    df2 = pd.read_excel(employee_file, header=0, engine="calamine")
-    df2 = df2[["*资源姓名", "Uniportal账号", "*ID编码"]]
-    df2 = df2.rename(
-        columns={"*资源姓名": "资源姓名", "*ID编码": "ID编码"}
-    ).drop_duplicates()
+    employee_lookup = load_employee_lookup(employee_file)
+    identities = IdentityRegistry(employee_lookup.identities)
 
-    df1["身份证号"] = df1["身份证号"].astype(str).str.strip()
-    df2["ID编码"] = df2["ID编码"].astype(str).str.strip()
+    id_codes = identities.encode(df1["身份证号"])
+    df1["身份证号"] = identities.decode(id_codes)
 
-    # 使用映射方法添Uniportal账号列（类似第32-45行的逻辑）
-    id_mapping = df2.set_index("ID编码")["Uniportal账号"].to_dict()
-    df1["Uniportal账号"] = df1["身份证号"].map(id_mapping)
+    # 使用映射方法添加Uniportal账号列
+    account_codes = employee_lookup.id_to_account.lookup(
+        id_codes, IdentityRegistry.MISSING
+    )
+    df1["Uniportal账号"] = identities.decode(account_codes)
 
     return df1
 
 
+def to_day(dates: pd.Series) -> pd.Series:
+    """日期列转换为datetime64并去掉时刻（已是日期类型时不重新解析）"""
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates)
+    return dates.dt.normalize()
+
+
+# 缺失日期在关联键中的天数（远超实际日期范围）
+_MISSING_DAY = 2**31 - 1
+
+
+def _day_numbers(dates: pd.Series) -> np.ndarray:
+    """日期转换为整数天数作为关联键，缺失日期统一为同一个值"""
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates, errors="coerce", format="mixed")
+    return dates.to_numpy(dtype="datetime64[D]").astype(np.int64)
+
+
+def _join_keys(account_codes: np.ndarray, dates: pd.Series) -> np.ndarray:
+    """账号编码和日期天数组合为一个int64关联键（高32位为账号，低32位为天数）"""
+    days = _day_numbers(dates)
+    days = np.where(days == np.iinfo(np.int64).min, _MISSING_DAY, days)
+    return (account_codes << 32) | (days & 0xFFFFFFFF)
+
+
 def process_vehicle_attendance(
-    vehicle_file: str, personnel_df: pd.DataFrame
+    vehicle_file: str,
+    personnel_df: pd.DataFrame,
+    identities: Optional[IdentityRegistry] = None,
 ) -> pd.DataFrame:
-    """处理车辆出勤记录，添加Uniportal账号"""
-    df = pd.read_excel(vehicle_file, header=1, engine="calamine", parse_dates=["日期"])
-    df["日期"] = pd.to_datetime(df["日期"]).dt.date.astype(str)
-
-    # 确保类型正确
-    df["上传人id"] = (
-        df["上传人id"].astype(str).str.strip()
-    )  # 转换上传人ID为字符串并去除空格
-    personnel_df["u_uid"] = (
-        personnel_df["u_uid"].astype(str).str.strip()
-    )  # 转换人员表UUID为字符串并去除空格
-
-    account_mapping = personnel_df.set_index("u_uid")[
-        "Uniportal账号"
-    ].to_dict()  # 创建UUID到账号的映射字典
-    df["Uniportal账号"] = df["上传人id"].map(
-        account_mapping
-    )  # 根据映射将上传人ID转换为Uniportal账号
-
-    # 清理Uniportal账号
-    df["Uniportal账号"] = df["Uniportal账号"].astype(str).str.strip()
+    """处理车辆出勤记录，添加Uniportal账号（identities为共享的员工标识驻留表）"""
+    identities = IdentityRegistry(identities)
+    df = read_input_file(vehicle_file, "vehicle")
+    df["日期"] = to_day(df["日期"])
+
+    # 上传人ID和人员表UUID转换为标识编码（字符串并去除空格）
+    uploader_codes = identities.encode(df["上传人id"])
+    df["上传人id"] = identities.decode(uploader_codes)
+    uid_codes = identities.encode(personnel_df["u_uid"])
+    personnel_df["u_uid"] = identities.decode(uid_codes)
+
+    # 根据UUID到账号的编码映射将上传人ID转换为Uniportal账号
+    account_mapping = CodeMapping(
+        uid_codes, identities.encode(personnel_df["Uniportal账号"])
+    )
+    df["Uniportal账号"] = identities.decode(
+        account_mapping.lookup(uploader_codes, IdentityRegistry.MISSING)
+    )
 
     return df
 
 
-def process_task_progress(task_file: str, employee_file: str = None) -> pd.DataFrame:
-    """处理任务进展，任务状态作为列名"""
-    df = pd.read_excel(task_file, header=0, engine="calamine", parse_dates=["工单日期"])
-    df = df[df["工单类别"] != "后台工单"]
+def encode_task_status(statuses: pd.Series) -> np.ndarray:
+    """任务状态编码为任务进展在TASK_STATUS_COLUMNS中的位置，未映射的状态归为未知"""
+    positions, uniques = pd.factorize(statuses)
+    progress = pd.Index(uniques).map(TASK_STATUS_MAPPING).fillna("未知")
+
+    # 末位对应缺失的任务状态
+    table = np.append(
+        pd.Index(TASK_STATUS_COLUMNS).get_indexer(progress),
+        TASK_STATUS_COLUMNS.index("未知"),
+    )
+    return table[positions]
+
+
+def _group_codes(df: pd.DataFrame, columns) -> np.ndarray:
+    """多列分组键编码为一个整数，编码顺序与各列排序后的字典序一致，含缺失值的行为-1"""
+    key = np.zeros(len(df), dtype=np.int64)
+    size = 1
+    missing = np.zeros(len(df), dtype=bool)
+    for column in columns:
+        codes, uniques = pd.factorize(df[column], sort=True)
+        missing |= codes < 0
+        cardinality = max(len(uniques), 1)
+        # 组合键可能溢出时先压缩为连续编码
+        if size * cardinality >= 2**62:
+            key, compressed = pd.factorize(key, sort=True)
+            size = len(compressed)
+        key = key * cardinality + codes
+        size *= cardinality
+    key[missing] = -1
+    return key
+
+
+def _count_by_status(
+    df: pd.DataFrame, index_columns, status_codes: np.ndarray
+) -> pd.DataFrame:
+    """按分组键统计各任务进展的数量，结果与 pivot_table(aggfunc="size") 一致
+
+    分组键编码为整数后用一次bincount完成计数；含缺失值的分组被丢弃，
+    行按分组键排序，状态列按列名排序且只包含出现过的状态。
+    """
+    key = _group_codes(df, index_columns)
+    kept = key >= 0
+    group_ids, groups = pd.factorize(key[kept], sort=True)
+
+    # 每个分组任取一行（同组各行的分组列取值相同）作为结果的分组列
+    group_rows = np.empty(len(groups), dtype=np.int64)
+    group_rows[group_ids] = np.arange(len(group_ids))
+
+    width = len(TASK_STATUS_COLUMNS)
+    counts = np.bincount(
+        group_ids * width + status_codes[kept], minlength=len(groups) * width
+    ).reshape(-1, width)
+
+    result = df.loc[kept, index_columns].iloc[group_rows].reset_index(drop=True)
+    present = counts.sum(axis=0) > 0
+    for position in sorted(
+        np.flatnonzero(present), key=TASK_STATUS_COLUMNS.__getitem__
+    ):
+        result[TASK_STATUS_COLUMNS[position]] = counts[:, position]
+    return result
 
-    # 如果提供了employee_file，使用映射添加责任人姓名
-    if employee_file:
-        df2 = pd.read_excel(employee_file, header=0, engine="calamine")
-        df2 = df2[["*资源姓名", "Uniportal账号", "*ID编码"]]
-        df2 = df2.rename(
-            columns={"*资源姓名": "资源姓名", "*ID编码": "ID编码"}
-        ).drop_duplicates()
 
-        # 清理账号列
-        df["责任人账号"] = df["责任人账号"].astype(str).str.strip()
-        df2["Uniportal账号"] = df2["Uniportal账号"].astype(str).str.strip()
+def process_task_progress(task_file: str, employee_file=None) -> pd.DataFrame:
+    """处理任务进展，任务状态作为列名（employee_file可为文件或EmployeeLookup）"""
+    df = read_input_file(task_file, "task")
+    df = df[df["工单类别"] != "后台工单"]
+
+    employee_lookup = load_employee_lookup(employee_file) if employee_file else None
+    identities = IdentityRegistry(
+        employee_lookup.identities if employee_lookup else None
+    )
 
-        # 创建映射：Uniportal账号 -> 资源姓名
-        id_mapping = df2.set_index("Uniportal账号")["资源姓名"].to_dict()
+    # 清理账号列（在分组计数前完成，结果中的账号已是规范化的标识）
+    account_codes = identities.encode(df["责任人账号"])
+    df["责任人账号"] = identities.decode(account_codes)
 
+    # 如果提供了employee_file，使用映射添加责任人姓名
+    if employee_lookup:
         # 将所有资源姓名映射到责任人姓名列（完全替换）
-        df["责任人姓名"] = df["责任人账号"].map(id_mapping)
-
-    status_mapping = {
-        "测试中": "待执行",
-        "待执行": "待执行",
-        "第三方上传完成": "完成",
-        "分析失败": "完成",
-        "分析中": "完成",
-        "评审不通过": "完成",
-        "评审中": "完成",
-        "审核不通过": "完成",
-        "审核通过": "通过",
-        "已分配": "待执行",
-        "已关闭": "通过",
-        "已接纳": "待执行",
-        "已开始": "待执行",
-        "已完成": "通过",
-        "已指派": "待执行",
-        "执行中": "待执行",
-    }
+        df["责任人姓名"] = employee_lookup.account_to_name.lookup(account_codes, np.nan)
 
-    df["任务进展"] = df["任务状态"].map(status_mapping).fillna("未知")
-    df["工单日期"] = pd.to_datetime(df["工单日期"]).dt.date.astype(str)
+    df["工单日期"] = to_day(df["工单日期"])
 
     # 任务进展作为列名 - 使用原始列名
-    result = df.pivot_table(
-        index=[
-            "省份",
-            "地市",
-            "责任人账号",
-            "责任人姓名",
-            "工单日期",
-        ],
-        columns="任务进展",
-        aggfunc="size",
-        fill_value=0,
-    ).reset_index()
-    result.columns.name = None
+    result = _count_by_status(
+        df,
+        ["省份", "地市", "责任人账号", "责任人姓名", "工单日期"],
+        encode_task_status(df["任务状态"]),
+    )
 
     # 修改多个列名
     result = result.rename(
@@ -122,83 +300,150 @@ def process_task_progress(task_file: str, employee_file: str = None) -> pd.DataF
     )
 
     # 确保所有状态列都存在
-    for status in ["待执行", "完成", "通过", "未知"]:
+    for status in TASK_STATUS_COLUMNS:
         if status not in result.columns:
             result[status] = 0
-    # 清理账号列 - 使用新的列名
-    result["Uniportal账号"] = result["Uniportal账号"].astype(str).str.strip()
 
     return result
 
 
 def merge_vehicle_with_tasks(
-    vehicle_df: pd.DataFrame, task_df: pd.DataFrame
+    vehicle_df: pd.DataFrame,
+    task_df: pd.DataFrame,
+    identities: Optional[IdentityRegistry] = None,
 ) -> pd.DataFrame:
-    """合并车辆记录和任务进展"""
-
-    # 确保账号类型一致
-    vehicle_df["Uniportal账号"] = vehicle_df["Uniportal账号"].astype(str).str.strip()
-    task_df["Uniportal账号"] = task_df["Uniportal账号"].astype(str).str.strip()
-
-    # 创建复合键映射（账号 + 日期）
-    task_df["复合键"] = task_df["Uniportal账号"] + "_" + task_df["日期"].astype(str)
-    vehicle_df["复合键"] = (
-        vehicle_df["Uniportal账号"] + "_" + vehicle_df["日期"].astype(str)
-    )
-
-    # 使用映射方法添加任务进展列
-    task_mapping = {}
-    for _, row in task_df.iterrows():
-        key = row["复合键"]
-        task_mapping[key] = {
-            "待执行": row.get("待执行", 0),
-            "完成": row.get("完成", 0),
-            "通过": row.get("通过", 0),
-            "未知": row.get("未知", 0),
-        }
-
-    # 为车辆记录添加任务进展相关的列
-    for column in ["待执行", "完成", "通过", "未知"]:
-        vehicle_df[column] = vehicle_df["复合键"].map(
-            lambda x: task_mapping.get(x, {}).get(column, 0)
-        )
-
-    # 清理临时列
-    vehicle_df = vehicle_df.drop(columns=["复合键"])
+    """合并车辆记录和任务进展（按 账号+日期 向量化关联）
 
-    return vehicle_df
+    identities为共享的员工标识驻留表，两表中的员工账号取其中的同一编码关联。
+    """
+    identities = IdentityRegistry(identities)
 
-
-if __name__ == "__main__":
-    # 文件路径
-    personnel_file = r"D:\WenJianfeng\桌面\车辆\人员明细信息.xlsx"
-    employee_file = r"D:\WenJianfeng\桌面\车辆\IResourceEmployee20260112135936.xlsx"
-    vehicle_file = r"D:\WenJianfeng\桌面\车辆\车辆出勤记录信息.xlsx"
-    task_file = (
-        r"D:\WenJianfeng\桌面\车辆\前后台工单履行率明细_original_20260112101759.xlsx"
+    # 关联键为（账号编码, 日期天数）组合成的整数。两个输入是分别缓存的流程节点结果，
+    # 只保存规范化后的账号字符串，在这里按共享驻留表取回编码（只分解唯一值）
+    vehicle_keys = _join_keys(
+        identities.encode(vehicle_df["Uniportal账号"]), vehicle_df["日期"]
+    )
+    task_keys = pd.Index(
+        _join_keys(identities.encode(task_df["Uniportal账号"]), task_df["日期"])
     )
 
-    # 1. 合并人员信息
-    print("1. 合并人员信息...")
-    personnel_df = merge_personnel_files(personnel_file, employee_file)
-
-    # 2. 处理车辆出勤记录
-    print("2. 处理车辆出勤记录...")
-    vehicle_df = process_vehicle_attendance(vehicle_file, personnel_df)
-
-    # 3. 处理任务进展（传入employee_file文件路径以获取责任人姓名映射）
-    print("3. 处理任务进展...")
-    task_df = process_task_progress(task_file, employee_file)
+    # 缺失的状态列按0处理；重复键保留最后一条（与原字典映射一致）
+    task_status = task_df.reindex(columns=TASK_STATUS_COLUMNS, fill_value=0)
+    unique_rows = ~task_keys.duplicated(keep="last")
+    task_status = task_status[unique_rows]
+    task_keys = task_keys[unique_rows]
+
+    # 一次性定位所有车辆记录对应的任务行，未匹配为-1
+    positions = task_keys.get_indexer(vehicle_keys)
+    matched = positions >= 0
+
+    status_columns = {}
+    for column in TASK_STATUS_COLUMNS:
+        values = task_status[column].to_numpy()
+        if len(values):
+            status_columns[column] = np.where(
+                matched, values.take(np.where(matched, positions, 0)), 0
+            )
+        else:
+            status_columns[column] = np.zeros(len(vehicle_df), dtype="int64")
+
+    result = vehicle_df.assign(**status_columns)
+
+    # 记录匹配情况
+    matched_count = int(matched.sum())
+    result.attrs["task_match_stats"] = {
+        "matched": matched_count,
+        "unmatched": len(result) - matched_count,
+    }
 
-    # 4. 合并车辆和任务数据
-    print("4. 合并车辆和任务数据...")
-    final_df = merge_vehicle_with_tasks(vehicle_df, task_df)
+    return result
 
-    # 保存结果
-    final_df.to_excel("结果.xlsx", index=False)
-    print("\n结果已保存到: 结果.xlsx")
 
-    # 显示结果
-    print("\n前5行结果:")
+def _build_task_pipeline_graph() -> PipelineGraph:
+    """工单分析流程的依赖关系：每个节点只依赖它实际用到的输入文件和上游节点"""
+    graph = PipelineGraph(
+        "task_pipeline",
+        ["personnel", "employee", "vehicle", "task"],
+        input_stage="解析输入文件",
+    )
+    # 员工映射缓存后只读，各节点以其标识驻留表为base登记新标识，员工标识的编码在各表间共享
+    graph.add_node(
+        "employee_lookup",
+        EmployeeLookup,
+        ["employee"],
+        stage="合并人员信息",
+    )
+    graph.add_node(
+        "personnel_df",
+        merge_personnel_files,
+        ["personnel", "employee_lookup"],
+        stage="合并人员信息",
+    )
+    graph.add_node(
+        "vehicle_df",
+        lambda vehicle, personnel_df, lookup: process_vehicle_attendance(
+            vehicle, personnel_df, lookup.identities
+        ),
+        ["vehicle", "personnel_df", "employee_lookup"],
+        stage="处理车辆出勤记录",
+    )
+    graph.add_node(
+        "task_df",
+        process_task_progress,
+        ["task", "employee_lookup"],
+        stage="处理任务进展",
+    )
+    graph.add_node(
+        "final_df",
+        lambda vehicle_df, task_df, lookup: merge_vehicle_with_tasks(
+            vehicle_df, task_df, lookup.identities
+        ),
+        ["vehicle_df", "task_df", "employee_lookup"],
+        stage="合并车辆和任务数据",
+    )
+    return graph
+
+
+task_pipeline_graph = _build_task_pipeline_graph()
+
+
+def run_task_pipeline(
+    personnel_file,
+    employee_file,
+    vehicle_file,
+    task_file,
+    progress: Optional[Callable[[str], None]] = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """执行工单分析流程，各节点结果按输入文件内容在服务进程内各会话间共享
+
+    只替换某个文件时，只重新解析该文件并重新计算依赖它的节点；
+    各节点的耗时和缓存状态记录在 final_df.attrs["pipeline_stats"]。
+    progress回调在进入每个阶段（见TASK_PIPELINE_STAGES）时以阶段名调用。
+    """
+    files = {
+        "personnel": personnel_file,
+        "employee": employee_file,
+        "vehicle": vehicle_file,
+        "task": task_file,
+    }
 
-    print(final_df.head())
+    if any(isinstance(source, pd.DataFrame) for source in files.values()):
+        # 已解析的数据没有文件内容哈希，不使用缓存
+        fingerprints = {kind: kind for kind in files}
+        cache = None
+    else:
+        # 以文件内容哈希为键，读取一次内容同时用于哈希和解析
+        files = {kind: read_source_bytes(source) for kind, source in files.items()}
+        fingerprints = {kind: content_hash(data) for kind, data in files.items()}
+        cache = shared_result_cache
+
+    run = task_pipeline_graph.run(
+        ["final_df", "task_df"],
+        fingerprints,
+        lambda kinds: read_input_files({kind: files[kind] for kind in kinds}),
+        cache=cache,
+        progress=progress,
+    )
+    final_df = run.results["final_df"]
+    final_df.attrs["pipeline_stats"] = run.nodes
+    return final_df, run.results["task_df"]
@@ -1,8 +1,59 @@
+import hashlib
+import weakref
+
 import pandas as pd
 import numpy as np
 from typing import Optional, Dict, Any, List
 from datetime import time, datetime
 
+from config import FILE_SCHEMAS
+from .excel_cache import read_excel_with_schema
+
+
+# 核查项依赖的配置项 -> (核查方法, 核查结果列)
+CHECK_DEPENDENCIES = {
+    "work_time": ("check_work_time", "工作时长核查"),
+    "mileage": ("check_mileage", "公里数核查"),
+    "toll_fee": ("check_toll_fee", "路桥费核查"),
+    "overtime_fee": ("check_overtime_fee", "加班费核查"),
+}
+
+# 已解析列缓存依赖的原始列：内容不变时增量核查才能复用缓存
+PARSED_SOURCE_COLUMNS = ["开始时间", "结束时间", "行驶里程", "路桥费", "加班费"]
+
+
+def check_result(conditions: list, choices: list) -> pd.Categorical:
+    """按条件生成核查结果：以整数编码的分类类型存储，标签只在展示/导出时使用"""
+    categories = list(dict.fromkeys(choices + ["数据错误"]))
+    codes = np.select(
+        conditions,
+        [categories.index(choice) for choice in choices],
+        default=categories.index("数据错误"),
+    )
+    return pd.Categorical.from_codes(codes.astype(np.int8), categories=categories)
+
+
+def get_abnormal_mask(df: pd.DataFrame, check_columns: Optional[List[str]] = None):
+    """获取异常行掩码：任一指定核查项异常即为True（与核查摘要的判定一致）
+
+    分类类型的核查列直接比较整数编码，不逐行比较字符串。
+    """
+    if check_columns is None:
+        check_columns = [
+            col for _, col in CHECK_DEPENDENCIES.values() if col in df.columns
+        ]
+
+    mask = np.zeros(len(df), dtype=bool)
+    for col in check_columns:
+        values = df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # 按类别查表；缺失值编码为-1，取到末位的False
+            abnormal = ~values.cat.categories.isin(["正常", ""])
+            mask |= np.append(abnormal, False)[values.cat.codes.to_numpy()]
+        else:
+            mask |= (values.notna() & ~values.isin(["正常", ""])).to_numpy()
+    return mask
+
 
 class DataChecker:
     """数据核查器"""
@@ -25,10 +76,51 @@ class DataChecker:
         if config:
             self.config.update(config)
 
-    def import_data(self, file_path: str) -> pd.DataFrame:
-        """导入并清洗数据"""
+        # 已解析的数值/时间列缓存，阈值变化时增量核查复用
+        self._reset_parsed_cache()
+
+    def _reset_parsed_cache(self):
+        """清空已解析列的缓存"""
+        self._parsed_cache: Dict[str, Any] = {}
+        self._parsed_fingerprint: Optional[str] = None
+        self._parsed_frame: Optional[weakref.ref] = None
+
+    @staticmethod
+    def _source_fingerprint(df: pd.DataFrame) -> str:
+        """解析缓存依赖的原始列（含行索引）的内容指纹"""
+        columns = [col for col in PARSED_SOURCE_COLUMNS if col in df.columns]
+        digest = hashlib.sha256(repr(columns).encode("utf-8"))
+        digest.update(
+            pd.util.hash_pandas_object(df[columns], index=True).to_numpy().tobytes()
+        )
+        return digest.hexdigest()
+
+    def _remember(self, df: pd.DataFrame):
+        """记录缓存对应的数据：同一对象直接复用，其他对象（如浅拷贝）按内容指纹比较"""
+        self._parsed_fingerprint = self._source_fingerprint(df)
+        self._parsed_frame = weakref.ref(df)
+
+    def _cached(self, df: pd.DataFrame, key: str, compute):
+        """获取已解析列的缓存，传入数据的内容变化时自动失效"""
+        if self._parsed_frame is None or self._parsed_frame() is not df:
+            fingerprint = self._parsed_fingerprint
+            self._remember(df)
+            if self._parsed_fingerprint != fingerprint:
+                self._parsed_cache = {}
+        if key not in self._parsed_cache:
+            self._parsed_cache[key] = compute()
+        return self._parsed_cache[key]
+
+    def _numeric(self, df: pd.DataFrame, col: str) -> pd.Series:
+        """获取转换为数值类型的列（带缓存）"""
+        return self._cached(
+            df, col, lambda: pd.to_numeric(df[col], errors="coerce")
+        )
+
+    def load_data(self, file_path: str) -> pd.DataFrame:
+        """读取并清洗数据（不执行核查）"""
         try:
-            df = pd.read_excel(file_path, header=1, engine="calamine")
+            df = read_excel_with_schema(file_path, FILE_SCHEMAS["attendance"])
 
             # 标准化列名（去除空格和特殊字符）
             df.columns = df.columns.str.strip()
@@ -37,16 +129,25 @@ class DataChecker:
             if "日期" in df.columns:
                 df["日期"] = pd.to_datetime(df["日期"], errors="coerce")
 
-            # 执行所有核查
-            df = self.perform_all_checks(df)
-
             return df
 
         except Exception as e:
             raise Exception(f"数据导入失败: {str(e)}")
 
+    def import_data(self, file_path: str) -> pd.DataFrame:
+        """导入并清洗数据，执行所有核查"""
+        df = self.load_data(file_path)
+
+        try:
+            return self.perform_all_checks(df)
+        except Exception as e:
+            raise Exception(f"数据导入失败: {str(e)}")
+
     def perform_all_checks(self, df: pd.DataFrame) -> pd.DataFrame:
         """执行所有核查"""
+        # 全量核查时重新解析数值/时间列
+        self._reset_parsed_cache()
+
         # 记录原始列名
         original_columns = df.columns.tolist()
 
@@ -59,16 +160,47 @@ class DataChecker:
         # 添加核查摘要
         df = self.add_check_summary(df, original_columns)
 
+        # 时间列已替换为解析后的值，按结果数据记录指纹，后续增量核查可复用缓存
+        self._remember(df)
+
         return df
 
+    def recheck(self, df: pd.DataFrame, config: Dict[str, Any]) -> pd.DataFrame:
+        """门限变化后增量核查：只重新计算受影响的核查列和摘要列"""
+        changed_sections = [
+            section
+            for section in CHECK_DEPENDENCIES
+            if section in config and config[section] != self.config.get(section)
+        ]
+        self.config.update(config)
+
+        if not changed_sections:
+            return df
+
+        # 浅拷贝，重新计算的列不影响原数据
+        df = df.copy(deep=False)
+        for section in changed_sections:
+            method_name, _ = CHECK_DEPENDENCIES[section]
+            df = getattr(self, method_name)(df)
+
+        return self.add_check_summary(df, df.columns.tolist())
+
     def check_work_time(self, df: pd.DataFrame) -> pd.DataFrame:
         """核查工作时长"""
         required_columns = ["开始时间", "结束时间"]
 
         if all(col in df.columns for col in required_columns):
             # 转换为datetime类型
-            df["开始时间"] = pd.to_datetime(df["开始时间"], errors="coerce")
-            df["结束时间"] = pd.to_datetime(df["结束时间"], errors="coerce")
+            df["开始时间"] = self._cached(
+                df,
+                "开始时间",
+                lambda: pd.to_datetime(df["开始时间"], errors="coerce"),
+            )
+            df["结束时间"] = self._cached(
+                df,
+                "结束时间",
+                lambda: pd.to_datetime(df["结束时间"], errors="coerce"),
+            )
 
             # 使用向量化操作提高性能
             start_missing = df["开始时间"].isna()
@@ -85,13 +217,32 @@ class DataChecker:
             elif isinstance(threshold_str, time):
                 work_time_threshold = threshold_str
 
-            early_start = df["开始时间"].dt.time > work_time_threshold
+            # 以当天零点起的时间差比较出车时间，避免逐行生成time对象
+            start_time_of_day = self._cached(
+                df,
+                "开始时间_当日时刻",
+                lambda: df["开始时间"] - df["开始时间"].dt.normalize(),
+            )
+            early_start = start_time_of_day > pd.Timedelta(
+                hours=work_time_threshold.hour,
+                minutes=work_time_threshold.minute,
+                seconds=work_time_threshold.second,
+                microseconds=work_time_threshold.microsecond,
+            )
 
             # 计算工作时长（小时）
-            work_duration = (df["结束时间"] - df["开始时间"]).dt.total_seconds() / 3600
+            work_duration = self._cached(
+                df,
+                "工作时长",
+                lambda: (df["结束时间"] - df["开始时间"]).dt.total_seconds() / 3600,
+            )
 
             # 检查跨天
-            cross_day = df["开始时间"].dt.date != df["结束时间"].dt.date
+            cross_day = self._cached(
+                df,
+                "跨天",
+                lambda: df["开始时间"].dt.normalize() != df["结束时间"].dt.normalize(),
+            )
 
             # 假设df['只打卡不出车']是布尔类型，True表示只打卡不出车
             is_punch_only = pd.Series(False, index=df.index)
@@ -153,7 +304,7 @@ class DataChecker:
                 ]
 
             df["工作时长"] = work_duration.round(1)
-            df["工作时长核查"] = np.select(conditions, choices, default="数据错误")
+            df["工作时长核查"] = check_result(conditions, choices)
 
         return df
 
@@ -161,7 +312,7 @@ class DataChecker:
         """核查公里数"""
         if "行驶里程" in df.columns:
             # 转换为数值类型
-            mileage_series = pd.to_numeric(df["行驶里程"], errors="coerce")
+            mileage_series = self._numeric(df, "行驶里程")
 
             conditions = [
                 mileage_series > self.config["mileage"]["max_mileage"],
@@ -177,14 +328,14 @@ class DataChecker:
                 "数据缺失或格式错误",
             ]
 
-            df["公里数核查"] = np.select(conditions, choices, default="数据错误")
+            df["公里数核查"] = check_result(conditions, choices)
 
         return df
 
     def check_toll_fee(self, df: pd.DataFrame) -> pd.DataFrame:
         """核查路桥费"""
         if "路桥费" in df.columns:
-            toll_series = pd.to_numeric(df["路桥费"], errors="coerce")
+            toll_series = self._numeric(df, "路桥费")
 
             conditions = [
                 toll_series > self.config["toll_fee"]["max_fee"],
@@ -200,14 +351,14 @@ class DataChecker:
                 "数据缺失或格式错误",
             ]
 
-            df["路桥费核查"] = np.select(conditions, choices, default="数据错误")
+            df["路桥费核查"] = check_result(conditions, choices)
 
         return df
 
     def check_overtime_fee(self, df: pd.DataFrame) -> pd.DataFrame:
         """核查加班费"""
         if "加班费" in df.columns:
-            overtime_series = pd.to_numeric(df["加班费"], errors="coerce")
+            overtime_series = self._numeric(df, "加班费")
 
             conditions = [
                 overtime_series > self.config["overtime_fee"]["max_fee"],
@@ -223,7 +374,7 @@ class DataChecker:
                 "数据缺失或格式错误",
             ]
 
-            df["加班费核查"] = np.select(conditions, choices, default="数据错误")
+            df["加班费核查"] = check_result(conditions, choices)
 
         return df
 
@@ -234,26 +385,37 @@ class DataChecker:
         check_columns = [col for col in df.columns if col.endswith("核查")]
 
         if check_columns:
-            # 检查是否存在异常
-            def get_summary(row):
-                issues = []
-                for col in check_columns:
-                    if row[col] not in ["正常", ""] and pd.notna(row[col]):
-                        issues.append(f"{col}: {row[col]}")
-
-                if issues:
-                    return "; ".join(issues)
-                return "全部正常"
-
-            df["核查摘要"] = df.apply(get_summary, axis=1)
-
-            # 计算异常数量
-            df["异常数量"] = df[check_columns].apply(
-                lambda row: sum(
-                    1 for val in row if val not in ["正常", ""] and pd.notna(val)
-                ),
-                axis=1,
+            # 核查结果取值很少：按取值组合分组，每种组合只生成一次摘要再按行展开
+            check_values = df[check_columns]
+            group_ids = (
+                check_values.groupby(
+                    check_columns, dropna=False, sort=False, observed=True
+                )
+                .ngroup()
+                .to_numpy()
             )
+            _, first_rows, inverse = np.unique(
+                group_ids, return_index=True, return_inverse=True
+            )
+
+            summaries = []
+            counts = []
+            for values in check_values.iloc[first_rows].itertuples(
+                index=False, name=None
+            ):
+                abnormal = [
+                    (col, val)
+                    for col, val in zip(check_columns, values)
+                    if val not in ["正常", ""] and pd.notna(val)
+                ]
+                issues = [f"{col}: {val}" for col, val in abnormal]
+                summaries.append("; ".join(issues) if issues else "全部正常")
+                counts.append(len(issues))
+
+            df["核查摘要"] = pd.Series(
+                np.array(summaries, dtype=object)[inverse], index=df.index
+            ).astype(str)
+            df["异常数量"] = np.array(counts, dtype="int64")[inverse]
 
         return df
 
@@ -267,7 +429,11 @@ class DataChecker:
                     "total": len(df),
                     "normal": (df[col] == "正常").sum(),
                     "abnormal": (df[col] != "正常").sum(),
-                    "distribution": df[col].value_counts().to_dict(),
+                    # 分类类型的value_counts包含未出现的类别，只保留实际出现的结果
+                    "distribution": df[col]
+                    .value_counts()
+                    .loc[lambda counts: counts > 0]
+                    .to_dict(),
                 }
 
         return stats
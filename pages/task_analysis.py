@@ -3,24 +3,37 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
-from core import (
-    merge_personnel_files,
-    process_vehicle_attendance,
-    process_task_progress,
-    merge_vehicle_with_tasks,
-)
+from core import TASK_PIPELINE_STAGES, run_task_pipeline
+from core.data_services import DateRangeIndex, FilterIndex, TaskCubeService
+from core.chart_sampling import TrendRenderPlan
+from core.figure_cache import cached_figure
+from core.job_runner import job_runner
 from components import (
     setup_page,
     create_sidebar_navigation,
     create_header,
     create_info_box,
     create_simple_metric,
+    wait_for_job,
+    memoize_section,
 )
+from components.ui_components import TableComponents
+
+# 后台处理任务的阶段：工单分析流程 + 构建聚合立方体
+PROCESSING_STAGES = TASK_PIPELINE_STAGES + ["构建聚合立方体"]
+
+# 处理节点状态的显示名称
+PIPELINE_STATUS_LABELS = {
+    "computed": "重新计算",
+    "cached": "使用缓存",
+    "loaded": "解析文件",
+}
 
 
 # ==================== 图表创建函数 ====================
 
 
+@cached_figure
 def create_trend_chart(df, date_col="日期"):
     """创建任务进展趋势图 - 显示完成+通过总和"""
     if "完成" not in df.columns or "通过" not in df.columns:
@@ -33,13 +46,18 @@ def create_trend_chart(df, date_col="日期"):
         )
         return fig
 
-    df["完成+通过"] = df["完成"] + df["通过"]
+    # 完成+通过按需计算，不写回数据集
+    completed = TaskCubeService.completed(df)
 
     if "市" in df.columns:
         city_date_grouped = (
-            df.groupby(["市", date_col])["完成+通过"].sum().reset_index()
+            completed.groupby([df["市"], df[date_col]]).sum().reset_index()
         )
         city_date_grouped[date_col] = pd.to_datetime(city_date_grouped[date_col])
+        # 按数据点数决定降采样、文字标签和WebGL
+        plan = TrendRenderPlan(
+            city_date_grouped.groupby("市", sort=False, observed=True).size()
+        )
 
         fig = go.Figure()
         colors = px.colors.qualitative.Set3 + px.colors.qualitative.Pastel
@@ -49,10 +67,9 @@ def create_trend_chart(df, date_col="日期"):
                 date_col
             )
             fig.add_trace(
-                go.Scatter(
+                plan.scatter(
                     x=city_data[date_col],
                     y=city_data["完成+通过"],
-                    mode="lines+markers+text",
                     name=city,
                     line=dict(
                         color=colors[i % len(colors)],
@@ -67,16 +84,16 @@ def create_trend_chart(df, date_col="日期"):
                 )
             )
     else:
-        date_grouped = df.groupby(date_col)["完成+通过"].sum().reset_index()
+        date_grouped = completed.groupby(df[date_col]).sum().reset_index()
         date_grouped[date_col] = pd.to_datetime(date_grouped[date_col])
         date_grouped = date_grouped.sort_values(date_col)
+        plan = TrendRenderPlan([len(date_grouped)])
 
         fig = go.Figure()
         fig.add_trace(
-            go.Scatter(
+            plan.scatter(
                 x=date_grouped[date_col],
                 y=date_grouped["完成+通过"],
-                mode="lines+markers+text",
                 name="完成+通过",
                 line=dict(color="#2ca02c", width=3, shape="spline", smoothing=1.3),
                 marker=dict(size=8, color="#2ca02c"),
@@ -110,6 +127,7 @@ def create_trend_chart(df, date_col="日期"):
     return fig
 
 
+@cached_figure
 def create_grouped_bar_chart(df, group_cols):
     """创建分组柱状图"""
     status_cols = ["待执行", "完成", "通过", "未知"]
@@ -158,6 +176,7 @@ def create_grouped_bar_chart(df, group_cols):
     return fig, None
 
 
+@cached_figure
 def create_zero_days_chart(df, group_cols):
     """创建零任务天数统计图"""
     status_cols = ["待执行", "完成", "通过"]
@@ -170,11 +189,15 @@ def create_zero_days_chart(df, group_cols):
     for col in group_cols:
         filter_condition &= df[col].notna()
 
-    valid_df = df[filter_condition].copy()
-    valid_df["任务总数"] = valid_df[status_cols].sum(axis=1)
+    valid_df = df[filter_condition]
+    task_total = valid_df[status_cols].sum(axis=1).rename("任务总数")
 
     group_cols_with_date = group_cols + ["日期"]
-    daily_stats = valid_df.groupby(group_cols_with_date)["任务总数"].sum().reset_index()
+    daily_stats = (
+        task_total.groupby([valid_df[col] for col in group_cols_with_date])
+        .sum()
+        .reset_index()
+    )
     daily_stats["为零天数"] = (daily_stats["任务总数"] == 0).astype(int)
 
     result = daily_stats.groupby(group_cols)["为零天数"].sum().reset_index()
@@ -208,35 +231,31 @@ def create_zero_days_chart(df, group_cols):
 # ==================== 数据处理函数 ====================
 
 
-def process_uploaded_files(personnel_file, employee_file, vehicle_file, task_file):
-    """处理上传的文件，返回处理后的数据"""
-    personnel_df = merge_personnel_files(personnel_file, employee_file)
-    vehicle_df = process_vehicle_attendance(vehicle_file, personnel_df)
-    task_df = process_task_progress(task_file, employee_file)
-    final_df = merge_vehicle_with_tasks(vehicle_df, task_df)
-    return final_df, task_df
+def process_uploaded_files(
+    personnel_file, employee_file, vehicle_file, task_file, progress=None
+):
+    """处理上传的文件（在后台任务中执行），返回处理结果和预聚合立方体"""
+    final_df, task_df = run_task_pipeline(
+        personnel_file, employee_file, vehicle_file, task_file, progress=progress
+    )
+
+    if progress:
+        progress("构建聚合立方体")
+    return {
+        "final_df": final_df,
+        "task_df": task_df,
+        "task_cube": TaskCubeService.build_cube(task_df),
+        "final_cube": TaskCubeService.build_cube(final_df),
+    }
 
 
 def filter_data_by_criteria(
     df, province=None, city=None, uploader=None, start_date=None, end_date=None
 ):
-    """根据筛选条件过滤数据"""
-    filtered_df = df.copy()
-
-    if province and province != "全部":
-        filtered_df = filtered_df[filtered_df["省"] == province]
-    if city and city != "全部":
-        filtered_df = filtered_df[filtered_df["市"] == city]
-    if uploader and uploader != "全部" and "上传人姓名" in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df["上传人姓名"] == uploader]
-    if start_date and end_date and "日期" in filtered_df.columns:
-        # 确保日期列是datetime类型
-        if filtered_df["日期"].dtype != "datetime64[ns]":
-            filtered_df["日期"] = pd.to_datetime(filtered_df["日期"], errors="coerce")
-        filtered_df = filtered_df[
-            (filtered_df["日期"] >= pd.Timestamp(start_date))
-            & (filtered_df["日期"] <= pd.Timestamp(end_date))
-        ].copy()
+    """根据筛选条件过滤数据（日期范围二分定位，省市上传人按编码比较）"""
+    filtered_df = DateRangeIndex.for_dataframe(df).select(
+        province, city, uploader, start_date, end_date
+    )
 
     return filtered_df
 
@@ -250,10 +269,8 @@ def calculate_uploader_stats(df, top_n=10):
     ):
         return pd.DataFrame()
 
-    df = df.copy()
-    df["完成+通过"] = df["完成"] + df["通过"]
-
-    uploader_avg = df.groupby("上传人姓名")["完成+通过"].mean().reset_index()
+    # 完成+通过在汇总时按需计算，不复制数据集
+    uploader_avg = TaskCubeService.rollup_mean(df, "上传人姓名")
     uploader_avg = uploader_avg.sort_values("完成+通过", ascending=False).head(top_n)
     uploader_avg["排名"] = range(1, len(uploader_avg) + 1)
 
@@ -265,21 +282,16 @@ def calculate_city_trends(df, max_cities=10):
     if "完成" not in df.columns or "通过" not in df.columns:
         return pd.DataFrame()
 
-    df = df.copy()
-    df["完成+通过"] = df["完成"] + df["通过"]
-
     if "市" in df.columns:
-        cities = df["市"].dropna().unique()
+        # 城市过多时只保留最先出现的几个城市的分组结果
+        avg_df = TaskCubeService.rollup_mean(df, ["市", "日期"])
+        cities = TaskCubeService.first_appearance(df, "市")
         if len(cities) > max_cities:
             main_cities = cities[:max_cities]
-            city_df = df[df["市"].isin(main_cities)]
-        else:
-            city_df = df
-
-        avg_df = city_df.groupby(["市", "日期"])["完成+通过"].mean().reset_index()
+            avg_df = avg_df[avg_df["市"].isin(main_cities)].reset_index(drop=True)
         return avg_df
     else:
-        avg_df = df.groupby("日期")["完成+通过"].mean().reset_index()
+        avg_df = TaskCubeService.rollup_mean(df, "日期")
         return avg_df
 
 
@@ -310,37 +322,34 @@ def create_uploader_bar_chart(uploader_stats):
     return fig
 
 
+@cached_figure
 def create_city_trend_chart(df, title="平均人效（完成+通过）（按城市）"):
     """创建城市趋势折线图"""
     if df.empty or "完成" not in df.columns or "通过" not in df.columns:
         return None
 
-    df = df.copy()
-    df["完成+通过"] = df["完成"] + df["通过"]
-
     if "市" not in df.columns:
         return None
 
+    # 完成+通过在汇总时按需计算，城市过多时只保留前10个城市的分组结果
+    avg_df = TaskCubeService.rollup_mean(df, ["市", "日期"])
     cities = df["市"].dropna().unique()
 
     if len(cities) > 10:
         main_cities = cities[:10]
-        city_df = df[df["市"].isin(main_cities)]
-    else:
-        city_df = df
-
-    avg_df = city_df.groupby(["市", "日期"])["完成+通过"].mean().reset_index()
+        avg_df = avg_df[avg_df["市"].isin(main_cities)].reset_index(drop=True)
 
+    # 按数据点数决定降采样、文字标签和WebGL
+    plan = TrendRenderPlan(avg_df.groupby("市", sort=False, observed=True).size())
     fig = go.Figure()
     colors = px.colors.qualitative.Set3 + px.colors.qualitative.Pastel
 
     for i, city in enumerate(avg_df["市"].unique()):
         city_data = avg_df[avg_df["市"] == city]
         fig.add_trace(
-            go.Scatter(
+            plan.scatter(
                 x=city_data["日期"],
                 y=city_data["完成+通过"],
-                mode="lines+markers+text",
                 name=city,
                 line=dict(
                     color=colors[i % len(colors)],
@@ -443,54 +452,21 @@ def render_trend_filters(df, date_min, date_max):
     col_filter1, col_filter2, col_filter3, col_filter4, col_filter5 = st.columns(5)
 
     filters = {}
+    # 层级筛选索引：每个数据集只构建一次，联动选项直接查表
+    filter_index = FilterIndex.for_dataframe(df)
 
     with col_filter1:
-        provinces = (
-            ["全部"] + sorted(df["省"].dropna().unique())
-            if "省" in df.columns
-            else ["全部"]
-        )
+        provinces = filter_index.province_options()
         filters["province"] = st.selectbox(
             "选择省份", options=provinces, key="trend_province"
         )
 
     with col_filter2:
-        if filters["province"] != "全部" and "市" in df.columns:
-            cities = ["全部"] + sorted(
-                df[df["省"] == filters["province"]]["市"].dropna().unique()
-            )
-        else:
-            cities = (
-                ["全部"] + sorted(df["市"].dropna().unique())
-                if "市" in df.columns
-                else ["全部"]
-            )
+        cities = filter_index.city_options(filters["province"])
         filters["city"] = st.selectbox("选择城市", options=cities, key="trend_city")
 
     with col_filter3:
-        if filters["province"] != "全部" and "上传人姓名" in df.columns:
-            uploaders = ["全部"] + sorted(
-                df[
-                    (df["省"] == filters["province"])
-                    & (
-                        df["市"] == filters["city"]
-                        if filters["city"] != "全部"
-                        else True
-                    )
-                ]["上传人姓名"]
-                .dropna()
-                .unique()
-            )
-        elif filters["city"] != "全部" and "上传人姓名" in df.columns:
-            uploaders = ["全部"] + sorted(
-                df[df["市"] == filters["city"]]["上传人姓名"].dropna().unique()
-            )
-        else:
-            uploaders = (
-                ["全部"] + sorted(df["上传人姓名"].dropna().unique())
-                if "上传人姓名" in df.columns
-                else ["全部"]
-            )
+        uploaders = filter_index.uploader_options(filters["province"], filters["city"])
         filters["uploader"] = st.selectbox(
             "选择上传人", options=uploaders, key="trend_uploader"
         )
@@ -514,28 +490,16 @@ def render_group_filters(df):
     """渲染分组统计筛选器"""
     col_province, col_city = st.columns(2)
     filters = {}
+    filter_index = FilterIndex.for_dataframe(df)
 
     with col_province:
-        provinces = (
-            ["全部"] + sorted(df["省"].dropna().unique())
-            if "省" in df.columns
-            else ["全部"]
-        )
+        provinces = filter_index.province_options()
         filters["province"] = st.selectbox(
             "选择省份", options=provinces, key="group_province"
         )
 
     with col_city:
-        if filters["province"] != "全部" and "市" in df.columns:
-            cities = ["全部"] + sorted(
-                df[df["省"] == filters["province"]]["市"].dropna().unique()
-            )
-        else:
-            cities = (
-                ["全部"] + sorted(df["市"].dropna().unique())
-                if "市" in df.columns
-                else ["全部"]
-            )
+        cities = filter_index.city_options(filters["province"])
         filters["city"] = st.selectbox("选择城市", options=cities, key="group_city")
 
     return filters
@@ -545,28 +509,16 @@ def render_zero_filters(df, date_min, date_max):
     """渲染零任务天数筛选器"""
     col_province, col_city, col_dates = st.columns(3)
     filters = {}
+    filter_index = FilterIndex.for_dataframe(df)
 
     with col_province:
-        provinces = (
-            ["全部"] + sorted(df["省"].dropna().unique())
-            if "省" in df.columns
-            else ["全部"]
-        )
+        provinces = filter_index.province_options()
         filters["province"] = st.selectbox(
             "选择省份", options=provinces, key="zero_province"
         )
 
     with col_city:
-        if filters["province"] != "全部" and "市" in df.columns:
-            cities = ["全部"] + sorted(
-                df[df["省"] == filters["province"]]["市"].dropna().unique()
-            )
-        else:
-            cities = (
-                ["全部"] + sorted(df["市"].dropna().unique())
-                if "市" in df.columns
-                else ["全部"]
-            )
+        cities = filter_index.city_options(filters["province"])
         filters["city"] = st.selectbox("选择城市", options=cities, key="zero_city")
 
     with col_dates:
@@ -582,7 +534,9 @@ def render_zero_filters(df, date_min, date_max):
 def render_data_preview(data):
     """渲染数据预览"""
     with st.expander("📋 工单明细详情", expanded=False):
-        st.dataframe(data, hide_index=True)
+        TableComponents.display_paginated_dataframe(
+            data, key="task_detail", hide_index=True
+        )
 
 
 # ==================== 主功能模块 ====================
@@ -623,24 +577,69 @@ def setup_data_processing_tab():
             create_info_box("请上传工单履行率文件", "warning")
             return
 
-        with st.spinner("正在处理数据，请稍候..."):
-            try:
-                final_df, task_df = process_uploaded_files(
-                    personnel_file, employee_file, vehicle_file, task_file
-                )
+        # 读取文件内容后提交到后台任务，页面重新运行不会中断处理
+        job = job_runner.submit(
+            process_uploaded_files,
+            PROCESSING_STAGES,
+            personnel_file.getvalue(),
+            employee_file.getvalue(),
+            vehicle_file.getvalue(),
+            task_file.getvalue(),
+        )
+        st.session_state.processing_job_id = job.id
 
-                st.session_state.processed_data = final_df
-                st.session_state.task_data = task_df
-                st.session_state.final_df = final_df
-                st.session_state.processing_success = True
+    render_processing_job()
 
-                create_info_box(
-                    f"数据处理完成！共处理 {len(final_df)} 条记录。", "success"
-                )
 
-            except Exception as e:
-                st.session_state.processing_success = False
-                create_info_box(f"数据处理失败: {str(e)}", "error")
+def render_processing_job():
+    """显示后台处理任务的进度，任务结束后将结果写入会话"""
+    job_id = st.session_state.get("processing_job_id")
+    job = job_runner.get(job_id) if job_id else None
+    if job is None:
+        return
+
+    wait_for_job(job)
+    # 结果已由本会话取回，不再由任务执行器保留
+    job_runner.pop(job.id)
+    st.session_state.processing_job_id = None
+
+    if job.error is not None:
+        st.session_state.processing_success = False
+        create_info_box(f"数据处理失败: {str(job.error)}", "error")
+        return
+
+    final_df = job.result["final_df"]
+    st.session_state.processed_data = final_df
+    st.session_state.task_data = job.result["task_df"]
+    st.session_state.final_df = final_df
+    # 预聚合立方体，可视化页面的统计均在立方体上完成
+    st.session_state.task_cube = job.result["task_cube"]
+    st.session_state.final_cube = job.result["final_cube"]
+    st.session_state.processing_success = True
+
+    match_stats = final_df.attrs.get("task_match_stats", {})
+    create_info_box(
+        f"数据处理完成！共处理 {len(final_df)} 条记录，"
+        f"匹配工单 {match_stats.get('matched', 0)} 条，"
+        f"未匹配 {match_stats.get('unmatched', 0)} 条。",
+        "success",
+    )
+
+    # 各处理节点的耗时和缓存状态（未变化的文件直接复用缓存结果）
+    pipeline_stats = final_df.attrs.get("pipeline_stats")
+    if pipeline_stats:
+        with st.expander("⏱️ 处理步骤耗时", expanded=False):
+            stats_df = pd.DataFrame(pipeline_stats)
+            stats_df["status"] = stats_df["status"].map(PIPELINE_STATUS_LABELS)
+            stats_df = stats_df.rename(
+                columns={
+                    "node": "节点",
+                    "stage": "阶段",
+                    "status": "状态",
+                    "seconds": "耗时(秒)",
+                }
+            )
+            st.dataframe(stats_df, use_container_width=True, hide_index=True)
 
 
 def setup_visualization_tab():
@@ -656,32 +655,54 @@ def setup_visualization_tab():
 
     df = st.session_state.task_data
 
-    if "日期" in df.columns:
+    # 处理流程输出的日期已是日期类型；旧会话中的文本日期只在首次展示时转换
+    if "日期" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["日期"]):
         df["日期"] = pd.to_datetime(df["日期"], errors="coerce")
+
+    # 聚合立方体：处理数据时已构建，旧会话中不存在时补建
+    if st.session_state.get("task_cube") is None:
+        st.session_state.task_cube = TaskCubeService.build_cube(df)
+    cube = st.session_state.task_cube
+
+    if "日期" in cube.columns:
         date_min = (
-            df["日期"].min()
-            if not df["日期"].isna().all()
+            cube["日期"].min()
+            if not cube["日期"].isna().all()
             else pd.Timestamp("2024-01-01")
         )
         date_max = (
-            df["日期"].max()
-            if not df["日期"].isna().all()
+            cube["日期"].max()
+            if not cube["日期"].isna().all()
             else pd.Timestamp("2024-12-31")
         )
 
     st.markdown("## 📊 数据分析面板")
     st.markdown("---")
 
+    # 各区块独立重新运行：筛选条件变化只重新计算其所属的区块
+    render_trend_section(df, cube, date_min, date_max)
+
+    st.markdown("---")
+
+    render_group_section(cube)
+
+    st.markdown("---")
+
+    render_zero_section(cube, date_min, date_max)
+
+
+@st.fragment
+def render_trend_section(df, cube, date_min, date_max):
+    """渲染趋势分析区块（Top-n、趋势图、城市趋势共用趋势筛选条件）"""
     # 趋势分析部分
     st.markdown("### 📈 任务进展趋势分析")
     st.markdown("显示全部数据的任务状态按日期变化趋势")
 
-    filters = render_trend_filters(df, date_min, date_max)
+    filters = render_trend_filters(cube, date_min, date_max)
 
-    # 应用筛选
+    # 应用筛选：统计图表使用立方体切片，明细预览使用原始数据
     if len(filters["date_range"]) == 2:
-        trend_df = filter_data_by_criteria(
-            df,
+        trend_criteria = (
             filters["province"],
             filters["city"],
             filters["uploader"],
@@ -689,16 +710,30 @@ def setup_visualization_tab():
             filters["date_range"][1],
         )
     else:
-        trend_df = df.copy()
+        trend_criteria = ()
+    trend_df = memoize_section(
+        "trend_slice",
+        (cube, trend_criteria),
+        lambda: filter_data_by_criteria(cube, *trend_criteria),
+    )
+    detail_df = memoize_section(
+        "trend_detail",
+        (df, trend_criteria),
+        lambda: filter_data_by_criteria(df, *trend_criteria),
+    )
 
     # 上传人平均值分析
     st.markdown("### 📊 平均人效Top-n分析")
 
     if len(trend_df) > 0:
-        uploader_stats = calculate_uploader_stats(trend_df, filters.get("top_n", 10))
+        top_n = filters.get("top_n", 10)
+        uploader_stats, fig_uploader = memoize_section(
+            "uploader_top_n",
+            (trend_df, top_n),
+            lambda: build_uploader_section(trend_df, top_n),
+        )
 
         if not uploader_stats.empty:
-            fig_uploader = create_uploader_bar_chart(uploader_stats)
             if fig_uploader:
                 st.plotly_chart(fig_uploader, use_container_width=True)
 
@@ -707,37 +742,88 @@ def setup_visualization_tab():
 
     # 趋势图表
     st.markdown("### 📊 工单完成量（完成+通过）")
-    fig_trend = create_trend_chart(trend_df)
+    fig_trend, trend_summary = memoize_section(
+        "trend_chart",
+        (trend_df,),
+        lambda: (create_trend_chart(trend_df), get_trend_summary(trend_df)),
+    )
     st.plotly_chart(fig_trend, use_container_width=True)
 
     # 趋势数据汇总
     with st.expander("📋 趋势数据汇总", expanded=False):
-        trend_summary = get_trend_summary(trend_df)
         st.dataframe(trend_summary, use_container_width=True, hide_index=True)
 
     with st.expander("📋 详细数据预览", expanded=False):
-        st.dataframe(trend_df, hide_index=True)
+        TableComponents.display_paginated_dataframe(
+            detail_df, key="trend_detail", hide_index=True
+        )
 
     # 城市趋势分析
     st.markdown("### 📈 平均人效（完成+通过）（按城市）")
 
-    fig_city = create_city_trend_chart(trend_df)
+    fig_city = memoize_section(
+        "city_trend", (trend_df,), lambda: create_city_trend_chart(trend_df)
+    )
     if fig_city:
         st.plotly_chart(fig_city, use_container_width=True)
 
     # 详细数据预览
     with st.expander("📋 详细数据预览", expanded=False):
-        st.dataframe(trend_df, hide_index=True)
+        TableComponents.display_paginated_dataframe(
+            detail_df, key="city_detail", hide_index=True
+        )
 
-    st.markdown("---")
 
+def build_uploader_section(trend_df, top_n):
+    """计算上传人Top-n统计及其柱状图"""
+    uploader_stats = calculate_uploader_stats(trend_df, top_n)
+    if uploader_stats.empty:
+        return uploader_stats, None
+    return uploader_stats, create_uploader_bar_chart(uploader_stats)
+
+
+def build_group_section(group_df, group_cols):
+    """计算分组柱状图及分组汇总"""
+    fig, error = create_grouped_bar_chart(group_df, group_cols)
+    if not fig:
+        return fig, error, None
+
+    status_cols = ["待执行", "完成", "通过", "未知"]
+    group_summary = group_df.groupby(group_cols)[status_cols].sum()
+    return fig, error, group_summary
+
+
+def build_zero_section(zero_df, zero_group_cols):
+    """计算零任务天数图表及汇总"""
+    fig, error = create_zero_days_chart(zero_df, zero_group_cols)
+    if not fig:
+        return fig, error, None
+
+    status_cols = ["待执行", "完成", "通过"]
+    filter_cond = zero_df["日期"].notna()
+    for col in zero_group_cols:
+        filter_cond &= zero_df[col].notna()
+
+    valid_df = zero_df[filter_cond]
+    task_total = valid_df[status_cols].sum(axis=1).rename("任务总数")
+
+    daily_stats = (
+        task_total.groupby([valid_df[col] for col in zero_group_cols + ["日期"]])
+        .sum()
+        .reset_index()
+    )
+    daily_stats["为零天数"] = (daily_stats["任务总数"] == 0).astype(int)
+    zero_summary = daily_stats.groupby(zero_group_cols)["为零天数"].sum().reset_index()
+    return fig, error, zero_summary
+
+
+@st.fragment
+def render_group_section(cube):
+    """渲染分组统计区块"""
     # 分组统计分析
     st.markdown("### 📊 分组数据统计分析")
 
-    group_filters = render_group_filters(df)
-    group_df = filter_data_by_criteria(
-        df, group_filters["province"], group_filters["city"]
-    )
+    group_filters = render_group_filters(cube)
     group_cols = []
 
     if group_filters["province"] != "全部":
@@ -745,27 +831,36 @@ def setup_visualization_tab():
     if group_filters["city"] != "全部":
         group_cols.append("市")
     if not group_cols:
-        if "省" in df.columns:
+        if "省" in cube.columns:
             group_cols.append("省")
-        if "市" in df.columns:
+        if "市" in cube.columns:
             group_cols.append("市")
 
     if group_cols:
-        fig, error = create_grouped_bar_chart(group_df, group_cols)
+        fig, error, group_summary = memoize_section(
+            "group_bars",
+            (cube, group_filters["province"], group_filters["city"]),
+            lambda: build_group_section(
+                filter_data_by_criteria(
+                    cube, group_filters["province"], group_filters["city"]
+                ),
+                group_cols,
+            ),
+        )
         if fig:
             st.plotly_chart(fig, use_container_width=True)
 
             st.markdown("📋 分组数据汇总")
-            status_cols = ["待执行", "完成", "通过", "未知"]
-            group_summary = group_df.groupby(group_cols)[status_cols].sum()
             st.dataframe(group_summary, use_container_width=True)
         else:
             st.error(error)
     else:
         st.warning("数据中缺少省、市列，无法进行分组统计")
 
-    st.markdown("---")
 
+@st.fragment
+def render_zero_section(cube, date_min, date_max):
+    """渲染零任务天数区块"""
     # 零任务天数分析
     st.markdown("### ⚠️ 零任务天数统计分析")
 
@@ -773,15 +868,17 @@ def setup_visualization_tab():
         st.warning("⚠️ 没有零工单出车的情况")
         return
 
-    zero_filters = render_zero_filters(df, date_min, date_max)
-    zero_df = filter_data_by_criteria(
-        st.session_state.final_df,
-        zero_filters["province"],
-        zero_filters["city"],
-        None,
-        zero_filters["date_range"][0] if len(zero_filters["date_range"]) == 2 else None,
-        zero_filters["date_range"][1] if len(zero_filters["date_range"]) == 2 else None,
-    )
+    if st.session_state.get("final_cube") is None:
+        st.session_state.final_cube = TaskCubeService.build_cube(
+            st.session_state.final_df
+        )
+    final_cube = st.session_state.final_cube
+
+    zero_filters = render_zero_filters(cube, date_min, date_max)
+    if len(zero_filters["date_range"]) == 2:
+        zero_dates = tuple(zero_filters["date_range"])
+    else:
+        zero_dates = (None, None)
 
     zero_group_cols = []
     if zero_filters["province"] != "全部":
@@ -789,35 +886,30 @@ def setup_visualization_tab():
     if zero_filters["city"] != "全部":
         zero_group_cols.append("市")
     if not zero_group_cols:
-        if "省" in df.columns:
+        if "省" in cube.columns:
             zero_group_cols.append("省")
-        if "市" in df.columns:
+        if "市" in cube.columns:
             zero_group_cols.append("市")
 
     if zero_group_cols:
-        fig, error = create_zero_days_chart(zero_df, zero_group_cols)
+        fig, error, zero_summary = memoize_section(
+            "zero_days",
+            (final_cube, zero_filters["province"], zero_filters["city"], zero_dates),
+            lambda: build_zero_section(
+                filter_data_by_criteria(
+                    final_cube,
+                    zero_filters["province"],
+                    zero_filters["city"],
+                    None,
+                    *zero_dates,
+                ),
+                zero_group_cols,
+            ),
+        )
         if fig:
             st.plotly_chart(fig, use_container_width=True)
 
             st.markdown("📋 零任务天数汇总")
-            status_cols = ["待执行", "完成", "通过"]
-            filter_cond = zero_df["日期"].notna()
-            for col in zero_group_cols:
-                filter_cond &= zero_df[col].notna()
-
-            valid_df = zero_df[filter_cond].copy()
-            valid_df["任务总数"] = valid_df[status_cols].sum(axis=1)
-
-            daily_stats = (
-                valid_df.groupby(zero_group_cols + ["日期"])["任务总数"]
-                .sum()
-                .reset_index()
-            )
-            daily_stats["为零天数"] = (daily_stats["任务总数"] == 0).astype(int)
-            zero_summary = (
-                daily_stats.groupby(zero_group_cols)["为零天数"].sum().reset_index()
-            )
-
             st.dataframe(zero_summary, use_container_width=True)
         else:
             st.error(error)
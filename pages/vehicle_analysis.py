@@ -4,14 +4,23 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import date, time
 from typing import Dict, Any
-from core import VehicleDataChecker, get_vehicle_default_config
+from core import (
+    VehicleDataChecker,
+    get_vehicle_default_config,
+    get_abnormal_mask,
+)
+from core.data_services import DateRangeIndex
+from core.excel_cache import content_hash, read_source_bytes
+from core.result_cache import ResultCache, shared_result_cache
 from components import (
     create_sidebar_navigation,
     setup_page,
     create_header,
     create_info_box,
     create_simple_metric,
+    memoize_section,
 )
+from components.ui_components import TableComponents
 
 
 # setup_page() 函数已从 layout_components 导入，此处不再定义
@@ -36,6 +45,23 @@ def update_config():
     }
     st.session_state.config = config
 
+    # 已有核查结果时，只重新计算受门限变化影响的核查列；
+    # 相同文件和配置的核查结果在各会话间共享
+    checker = st.session_state.get("checker")
+    if st.session_state.get("data_loaded") and checker is not None:
+
+        def recheck():
+            df = checker.recheck(st.session_state.df, config)
+            return df, checker.get_statistics(df)
+
+        key = ResultCache.make_key(
+            "vehicle_checks", st.session_state.get("raw_file_digest"), config
+        )
+        df, stats = shared_result_cache.get_or_compute(key, recheck)
+        checker.config.update(config)
+        st.session_state.df = df
+        st.session_state.stats = stats
+
 
 def configView_set():
     col1, col2, col3 = st.columns(3)
@@ -338,7 +364,36 @@ def abnormal_data_view():
             )
 
         with st.expander("📊 核查明细详情", expanded=False):
-            st.dataframe(st.session_state.df, hide_index=True)
+            TableComponents.display_paginated_dataframe(
+                st.session_state.df,
+                key="check_detail",
+                hide_index=True,
+            )
+
+
+def load_uploaded_data(uploaded_file) -> pd.DataFrame:
+    """解析上传的文件，同一文件只解析一次，预览与核查共用解析结果"""
+    file_key = getattr(uploaded_file, "file_id", None) or (
+        uploaded_file.name,
+        uploaded_file.size,
+    )
+    if st.session_state.get("raw_file_key") != file_key:
+
+        def load():
+            raw_df = VehicleDataChecker().load_data(uploaded_file)
+            # 按日期排序保存，日期范围筛选可直接二分定位，无需复制排序
+            if "日期" in raw_df.columns:
+                raw_df = raw_df.sort_values("日期", kind="stable", ignore_index=True)
+            return raw_df
+
+        # 相同内容的文件在各会话间只解析一次
+        digest = content_hash(read_source_bytes(uploaded_file))
+        st.session_state.raw_df = shared_result_cache.get_or_compute(
+            ResultCache.make_key("attendance_data", digest), load
+        )
+        st.session_state.raw_file_digest = digest
+        st.session_state.raw_file_key = file_key
+    return st.session_state.raw_df
 
 
 #  数据导入
@@ -349,24 +404,44 @@ def data_import_view():
 
     if uploaded_file:
         if uploaded_file.name.endswith(".xlsx"):
-            df = pd.read_excel(uploaded_file, header=1, engine="calamine")
+            try:
+                raw_df = load_uploaded_data(uploaded_file)
+            except Exception as e:
+                st.error(f"❌ 读取文件时出错: {str(e)}")
+                return
+
+            with st.expander(
+                f"📋 数据预览（共 {len(raw_df)} 条记录）", expanded=False
+            ):
+                st.dataframe(raw_df.head(10), hide_index=True)
+
             if st.button("📥 执行核查", type="primary", use_container_width=True):
                 try:
-                    with st.spinner("正在导入数据并执行核查..."):
+                    with st.spinner("正在执行核查..."):
                         # 创建核查器实例
                         checker = VehicleDataChecker(st.session_state.config)
 
-                        # 使用上传的文件对象（不需要保存到本地）
-                        df = checker.import_data(uploaded_file)
+                        # 复用已解析的数据（浅拷贝，核查新增的列不影响原始数据）；
+                        # 相同文件和配置的核查结果在各会话间共享
+                        def check():
+                            df = checker.perform_all_checks(raw_df.copy(deep=False))
+                            return df, checker.get_statistics(df)
 
-                        # 获取统计信息
-                        stats = checker.get_statistics(df)
+                        key = ResultCache.make_key(
+                            "vehicle_checks",
+                            st.session_state.raw_file_digest,
+                            st.session_state.config,
+                        )
+                        df, stats = shared_result_cache.get_or_compute(key, check)
 
                         # 保存到session状态
                         st.session_state.df = df
                         st.session_state.data_loaded = True
                         st.session_state.checker = checker
                         st.session_state.stats = stats
+                        st.session_state.checked_file_digest = (
+                            st.session_state.raw_file_digest
+                        )
 
                         # 显示异常情况
                         abnormal_count = (df["异常数量"] > 0).sum()
@@ -374,13 +449,23 @@ def data_import_view():
                         st.success(f"✅ 数据导入和核查完成！共处理 {len(df)} 条记录。")
                         st.warning(f"⚠️ 发现 {abnormal_count} 条异常记录。")
 
-                        st.subheader("📊 车辆核查明细")
-                        st.dataframe(df, hide_index=False)
-
                 except Exception as e:
                     st.error(f"❌ 导入数据时出错: {str(e)}")
                     st.exception(e)  # 显示详细错误信息
 
+            # 核查明细在按钮之外显示，翻页、搜索后仍保持可见
+            if (
+                st.session_state.get("df") is not None
+                and st.session_state.get("checked_file_digest")
+                == st.session_state.raw_file_digest
+            ):
+                st.subheader("📊 车辆核查明细")
+                TableComponents.display_paginated_dataframe(
+                    st.session_state.df,
+                    key="import_detail",
+                        hide_index=False,
+                )
+
 
 def display_province_category_analysis1():
     """显示按省份和异常类别的分析"""
@@ -444,12 +529,12 @@ def display_province_category_analysis1():
     for check_col in available_checks:
         chart_title = check_col.replace("核查", "")
         with st.text(f"📊 {chart_title}异常"):
-            abnormal_df = df[df[check_col] != "正常"].copy()
+            abnormal_df = df[get_abnormal_mask(df, [check_col])]
             if abnormal_df.empty:
                 return
             # 按省份和异常类别分组统计
             category_stats = (
-                abnormal_df.groupby([province_col, check_col])
+                abnormal_df.groupby([province_col, check_col], observed=True)
                 .size()
                 .reset_index(name="数量")
             )
@@ -507,17 +592,17 @@ def compare_abnormal_types(df1, df2, start1, end1, start2, end2):
     """对比两个时间段的异常类型分布"""
     # 获取两个时间段的异常统计数据
     stats1 = {
-        "工作时长": (df1["工作时长核查"] != "正常").sum(),
-        "公里数": (df1["公里数核查"] != "正常").sum(),
-        "路桥费": (df1["路桥费核查"] != "正常").sum(),
-        "加班费": (df1["加班费核查"] != "正常").sum(),
+        "工作时长": get_abnormal_mask(df1, ["工作时长核查"]).sum(),
+        "公里数": get_abnormal_mask(df1, ["公里数核查"]).sum(),
+        "路桥费": get_abnormal_mask(df1, ["路桥费核查"]).sum(),
+        "加班费": get_abnormal_mask(df1, ["加班费核查"]).sum(),
     }
 
     stats2 = {
-        "工作时长": (df2["工作时长核查"] != "normal").sum(),
-        "公里数": (df2["公里数核查"] != "normal").sum(),
-        "路桥费": (df2["路桥费核查"] != "normal").sum(),
-        "加班费": (df2["加班费核查"] != "normal").sum(),
+        "工作时长": get_abnormal_mask(df2, ["工作时长核查"]).sum(),
+        "公里数": get_abnormal_mask(df2, ["公里数核查"]).sum(),
+        "路桥费": get_abnormal_mask(df2, ["路桥费核查"]).sum(),
+        "加班费": get_abnormal_mask(df2, ["加班费核查"]).sum(),
     }
 
     # 创建对比图表
@@ -602,13 +687,13 @@ def create_abnormal_type_comparison_chart(df1, df2, start1, end1, start2, end2):
 
     # 使用列表推导式计算异常统计数据
     stats1 = {
-        item: (df1[col] != "正常").sum()
+        item: get_abnormal_mask(df1, [col]).sum()
         for item, col in zip(check_items, check_columns)
         if col in df1.columns
     }
 
     stats2 = {
-        item: (df2[col] != "正常").sum()
+        item: get_abnormal_mask(df2, [col]).sum()
         for item, col in zip(check_items, check_columns)
         if col in df2.columns
     }
@@ -660,7 +745,9 @@ def create_category_bar_chart(
     """创建异常类别的分组柱状图"""
     # 按省份和异常类别分组统计
     category_stats = (
-        abnormal_df.groupby([group_col, check_col]).size().reset_index(name="数量")
+        abnormal_df.groupby([group_col, check_col], observed=True)
+        .size()
+        .reset_index(name="数量")
     )
 
     # 获取所有异常类别
@@ -672,8 +759,7 @@ def create_category_bar_chart(
         other_df = abnormal_df[~abnormal_df[check_col].isin(main_categories)]
         if len(other_df) > 0:
             categories = list(main_categories) + ["其他"]
-            other_df = other_df.copy()
-            other_df[check_col] = "其他"
+            other_df = other_df.assign(**{check_col: "其他"})
             abnormal_df = pd.concat(
                 [
                     abnormal_df[abnormal_df[check_col].isin(main_categories)],
@@ -681,7 +767,7 @@ def create_category_bar_chart(
                 ]
             )
             category_stats = (
-                abnormal_df.groupby([group_col, check_col])
+                abnormal_df.groupby([group_col, check_col], observed=True)
                 .size()
                 .reset_index(name="数量")
             )
@@ -749,8 +835,9 @@ def create_category_bar_chart(
     return fig
 
 
+@st.fragment
 def display_province_category_analysis():
-    """显示按省份和异常类别的分析"""
+    """显示按省份和异常类别的分析（筛选条件变化时只重新运行本区块）"""
     df = st.session_state.df
 
     # 检查核查列是否存在
@@ -851,35 +938,41 @@ def display_province_category_analysis():
         help="勾选后将使用时间段2数据进行对比分析",
     )
 
-    # 根据选择的条件筛选数据
-    filtered_df = df.copy()
-    filtered_df2 = df.copy()
-
-    # 省份筛选
-    if selected_province != "全部":
-        filtered_df = filtered_df[filtered_df["省"] == selected_province]
-        filtered_df2 = filtered_df2[filtered_df2["省"] == selected_province]
-
-    # 城市筛选
-    if selected_city != "全部":
-        filtered_df = filtered_df[filtered_df["市"] == selected_city]
-        filtered_df2 = filtered_df2[filtered_df2["市"] == selected_city]
-
-    # 日期筛选 - 时间段1
-    if start_date1 and end_date1 and "日期" in filtered_df.columns:
-        filtered_df = filtered_df[
-            (filtered_df["日期"].dt.date >= start_date1)
-            & (filtered_df["日期"].dt.date <= end_date1)
-        ]
+    # 根据选择的条件筛选数据：日期范围二分定位为连续切片，省市按编码比较
+    # 筛选结果按条件记忆，条件未变化的时间段直接复用上次的切片
+    date_index = DateRangeIndex.for_dataframe(df)
+    filtered_df = memoize_section(
+        "period1_slice",
+        (df, selected_province, selected_city, start_date1, end_date1),
+        lambda: date_index.select(
+            selected_province,
+            selected_city,
+            start_date=start_date1,
+            end_date=end_date1,
+            whole_days=True,
+        ),
+    )
 
-    # 日期筛选 - 时间段2（如果启用）
-    if apply_period2 and start_date2 and end_date2 and "日期" in filtered_df2.columns:
-        filtered_df2 = filtered_df2[
-            (filtered_df2["日期"].dt.date >= start_date2)
-            & (filtered_df2["日期"].dt.date <= end_date2)
-        ]
-    elif apply_period2:
-        filtered_df2 = pd.DataFrame()  # 如果没有时间段2数据，设置为空
+    def select_period2():
+        # 时间段2（如果启用）
+        if apply_period2 and start_date2 and end_date2 and "日期" in df.columns:
+            return date_index.select(
+                selected_province,
+                selected_city,
+                start_date=start_date2,
+                end_date=end_date2,
+                whole_days=True,
+            )
+        elif apply_period2:
+            return pd.DataFrame()  # 如果没有时间段2数据，设置为空
+        return date_index.select(selected_province, selected_city)
+
+    period2_dates = (start_date2, end_date2) if apply_period2 else None
+    filtered_df2 = memoize_section(
+        "period2_slice",
+        (df, selected_province, selected_city, apply_period2, period2_dates),
+        select_period2,
+    )
 
     # 显示筛选结果统计
     if selected_province == "全部" and selected_city == "全部":
@@ -887,14 +980,9 @@ def display_province_category_analysis():
         if apply_period2:
             st.info(f"📈 时间段2: {len(filtered_df2)} 条记录。")
     else:
-        # 筛选出4列都不为"正常"的数据
-        condition = (
-            (filtered_df["工作时长核查"] != "正常")
-            | (filtered_df["公里数核查"] != "正常")
-            | (filtered_df["路桥费核查"] != "正常")
-            | (filtered_df["加班费核查"] != "正常")
-        )
-        abnormal_all_df = filtered_df[condition].copy()
+        # 筛选出任一核查项异常的数据
+        condition = get_abnormal_mask(filtered_df)
+        abnormal_all_df = filtered_df[condition]
 
         # 显示筛选后的数据统计
         st.info(
@@ -902,19 +990,18 @@ def display_province_category_analysis():
         )
 
         if apply_period2:
-            condition2 = (
-                (filtered_df2["工作时长核查"] != "正常")
-                | (filtered_df2["公里数核查"] != "正常")
-                | (filtered_df2["路桥费核查"] != "正常")
-                | (filtered_df2["加班费核查"] != "正常")
-            )
-            abnormal_all_df2 = filtered_df2[condition2].copy()
+            condition2 = get_abnormal_mask(filtered_df2)
+            abnormal_all_df2 = filtered_df2[condition2]
             st.info(
                 f"📈 时间段2: {len(filtered_df2)} 条记录，异常记录{len(abnormal_all_df2)}条。"
             )
 
         with st.expander("异常记录详情", expanded=False):
-            st.dataframe(abnormal_all_df, hide_index=True)
+            TableComponents.display_paginated_dataframe(
+                abnormal_all_df,
+                key="region_abnormal",
+                hide_index=True,
+            )
 
     # 如果没有数据，显示提示
     if len(filtered_df) == 0:
@@ -928,6 +1015,12 @@ def display_province_category_analysis():
         group_col = "市"
     else:
         group_col = "省"
+
+    # 启用时间段2且有数据时按时间段对比，否则只分析时间段1
+    compare_df2 = filtered_df2 if apply_period2 and len(filtered_df2) > 0 else None
+    period1 = f"{start_date1} 至 {end_date1}"
+    period2 = f"{start_date2} 至 {end_date2}" if compare_df2 is not None else None
+
     # ========== 小计平均值分析（在工作时长异常分析前） ==========
     if "小计" in df.columns:
         st.markdown("### 💰 平均车辆费用对比分析")
@@ -937,390 +1030,401 @@ def display_province_category_analysis():
             f"时间段2: {start_date2} 至 {end_date2}**"
         )
 
-        # 筛选小计不为0的数据
-        valid_df1 = filtered_df[filtered_df["小计"] != 0].copy()
+        fig, summary, message = memoize_section(
+            "subtotal_comparison",
+            (filtered_df, compare_df2, group_col, period1, period2),
+            lambda: build_subtotal_comparison(
+                filtered_df, compare_df2, group_col, period1, period2
+            ),
+        )
+        if fig is not None:
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info(message)
 
-        # 时间段1的小计平均值按省市分组
-        if not valid_df1.empty:
-            period1_stats = (
-                valid_df1.groupby([group_col, "日期"])["小计"].mean().reset_index()
-            )
+        # 显示汇总数据表
+        with st.expander("📋 小计平均值汇总数据", expanded=False):
+            if summary is not None:
+                st.dataframe(summary, use_container_width=True, hide_index=True)
 
-            # 按省市汇总平均值
-            period1_summary = (
-                period1_stats.groupby(group_col)["小计"].mean().reset_index()
-            )
-            period1_summary.columns = [group_col, "时间段1小计平均值"]
-
-            # 创建时间段1的折线图
-            fig1 = go.Figure()
-            fig1.add_trace(
-                go.Scatter(
-                    x=period1_summary[group_col],
-                    y=period1_summary["时间段1小计平均值"],
-                    mode="lines+markers+text",
-                    name=f"时间段1 ({start_date1} 至 {end_date1})",
-                    line=dict(color="#636EFA", width=3, shape="spline", smoothing=1.3),
-                    marker=dict(size=8, color="#636EFA"),
-                    text=period1_summary["时间段1小计平均值"].round(2),
-                    textposition="top center",
-                    textfont=dict(size=10),
-                )
-            )
-            fig1.update_layout(
-                title=f"时间段1 ({start_date1} 至 {end_date1}) 小计平均值",
-                xaxis_title="地区",
-                yaxis_title="小计平均值",
-                xaxis_tickangle=-45,
-                height=400,
-                plot_bgcolor="white",
-                paper_bgcolor="white",
-                hovermode="x unified",
-            )
+        st.markdown("---")
 
-        # 时间段2的小计平均值
-        if apply_period2 and len(filtered_df2) > 0:
-            valid_df2 = filtered_df2[filtered_df2["小计"] != 0].copy()
+    # 创建4个图表，每个核查项一个
+    for check_col in available_checks:
+        render_check_anomaly_section(
+            check_col,
+            filtered_df,
+            compare_df2,
+            group_col,
+            selected_province,
+            selected_city,
+            period1,
+            period2,
+        )
 
-            if not valid_df2.empty:
-                period2_stats = (
-                    valid_df2.groupby([group_col, "日期"])["小计"].mean().reset_index()
-                )
-                period2_summary = (
-                    period2_stats.groupby(group_col)["小计"].mean().reset_index()
-                )
-                period2_summary.columns = [group_col, "时间段2小计平均值"]
-
-                # 合并两个时间段的数据
-                combined_summary = pd.merge(
-                    period1_summary, period2_summary, on=group_col, how="outer"
-                ).fillna(0)
-                # 创建双折线图对比
-                fig_combined = go.Figure()
-
-                fig_combined.add_trace(
-                    go.Scatter(
-                        x=combined_summary[group_col],
-                        y=combined_summary["时间段1小计平均值"],
-                        mode="lines+markers+text",
-                        name=f"时间段1 ({start_date1} 至 {end_date1})",
-                        line=dict(
-                            color="#636EFA", width=3, shape="spline", smoothing=1.3
-                        ),
-                        marker=dict(size=8, color="#636EFA"),
-                        text=combined_summary["时间段1小计平均值"].round(2),
-                        textposition="top center",
-                        textfont=dict(size=10),
-                    )
-                )
 
-                fig_combined.add_trace(
-                    go.Scatter(
-                        x=combined_summary[group_col],
-                        y=combined_summary["时间段2小计平均值"],
-                        mode="lines+markers+text",
-                        name=f"时间段2 ({start_date2} 至 {end_date2})",
-                        line=dict(
-                            color="#EF553B", width=3, shape="spline", smoothing=1.3
-                        ),
-                        marker=dict(size=8, color="#EF553B"),
-                        text=combined_summary["时间段2小计平均值"].round(2),
-                        textposition="top center",
-                        textfont=dict(size=10),
-                    )
-                )
+def _subtotal_summary(filtered_df, group_col, value_name):
+    """按地区汇总小计平均值（先按日期求均值，再按地区求均值），忽略小计为0的数据"""
+    valid_df = filtered_df[filtered_df["小计"] != 0]
+    if valid_df.empty:
+        return None
 
-                fig_combined.update_layout(
-                    title="📊 平均车辆费用对比分析",
-                    xaxis_title="地区",
-                    yaxis_title="小计平均值",
-                    xaxis_tickangle=-45,
-                    height=500,
-                    plot_bgcolor="white",
-                    paper_bgcolor="white",
-                    hovermode="x unified",
-                    legend=dict(
-                        yanchor="top", y=-0.25, xanchor="center", x=0.5, orientation="h"
-                    ),
-                )
+    daily_stats = valid_df.groupby([group_col, "日期"])["小计"].mean().reset_index()
+    summary = daily_stats.groupby(group_col)["小计"].mean().reset_index()
+    summary.columns = [group_col, value_name]
+    return summary
+
+
+def _subtotal_trace(summary, group_col, value_name, name, color):
+    """创建小计平均值折线"""
+    return go.Scatter(
+        x=summary[group_col],
+        y=summary[value_name],
+        mode="lines+markers+text",
+        name=name,
+        line=dict(color=color, width=3, shape="spline", smoothing=1.3),
+        marker=dict(size=8, color=color),
+        text=summary[value_name].round(2),
+        textposition="top center",
+        textfont=dict(size=10),
+    )
 
-                st.plotly_chart(fig_combined, use_container_width=True)
 
-            else:
-                st.info("时间段2无有效数据")
-        else:
-            # 只显示时间段1的图表
-            if not valid_df1.empty:
-                st.plotly_chart(fig1, use_container_width=True)
-            else:
-                st.info("时间段1无有效数据")
+def build_subtotal_comparison(filtered_df, filtered_df2, group_col, period1, period2):
+    """计算小计平均值图表和汇总表，filtered_df2为None时只统计时间段1
 
-        # 显示汇总数据表
-        with st.expander("📋 小计平均值汇总数据", expanded=False):
-            if apply_period2 and len(filtered_df2) > 0 and not valid_df2.empty:
-                st.dataframe(
-                    combined_summary, use_container_width=True, hide_index=True
-                )
-            elif not valid_df1.empty:
-                st.dataframe(period1_summary, use_container_width=True, hide_index=True)
+    返回 (图表, 汇总表, 无图表时的提示)。
+    """
+    period1_summary = _subtotal_summary(filtered_df, group_col, "时间段1小计平均值")
 
-        st.markdown("---")
+    if filtered_df2 is None:
+        # 只显示时间段1的图表
+        if period1_summary is None:
+            return None, None, "时间段1无有效数据"
 
-    # 创建4个图表，每个核查项一个
-    for check_col in available_checks:
-        chart_title = check_col.replace("核查", "")
+        fig1 = go.Figure()
+        fig1.add_trace(
+            _subtotal_trace(
+                period1_summary,
+                group_col,
+                "时间段1小计平均值",
+                f"时间段1 ({period1})",
+                "#636EFA",
+            )
+        )
+        fig1.update_layout(
+            title=f"时间段1 ({period1}) 小计平均值",
+            xaxis_title="地区",
+            yaxis_title="小计平均值",
+            xaxis_tickangle=-45,
+            height=400,
+            plot_bgcolor="white",
+            paper_bgcolor="white",
+            hovermode="x unified",
+        )
+        return fig1, period1_summary, None
+
+    period2_summary = _subtotal_summary(filtered_df2, group_col, "时间段2小计平均值")
+    if period2_summary is None:
+        return None, period1_summary, "时间段2无有效数据"
+
+    if period1_summary is None:
+        period1_summary = pd.DataFrame(columns=[group_col, "时间段1小计平均值"])
+
+    # 合并两个时间段的数据
+    combined_summary = pd.merge(
+        period1_summary, period2_summary, on=group_col, how="outer"
+    ).fillna(0)
+
+    # 创建双折线图对比
+    fig_combined = go.Figure()
+    fig_combined.add_trace(
+        _subtotal_trace(
+            combined_summary,
+            group_col,
+            "时间段1小计平均值",
+            f"时间段1 ({period1})",
+            "#636EFA",
+        )
+    )
+    fig_combined.add_trace(
+        _subtotal_trace(
+            combined_summary,
+            group_col,
+            "时间段2小计平均值",
+            f"时间段2 ({period2})",
+            "#EF553B",
+        )
+    )
+    fig_combined.update_layout(
+        title="📊 平均车辆费用对比分析",
+        xaxis_title="地区",
+        yaxis_title="小计平均值",
+        xaxis_tickangle=-45,
+        height=500,
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        hovermode="x unified",
+        legend=dict(yanchor="top", y=-0.25, xanchor="center", x=0.5, orientation="h"),
+    )
+    return fig_combined, combined_summary, None
 
-        # 创建子标题
-        st.markdown(f"### 📊 {chart_title}异常分析")
 
-        if apply_period2 and len(filtered_df2) > 0:
-            # ========== 时间段对比模式 ==========
-            st.markdown(
-                f"**时间段1 ({start_date1} 至 {end_date1}) vs 时间段2 ({start_date2} 至 {end_date2})**"
+def create_period_check_chart(abnormal_df, check_col, group_col, chart_title):
+    """创建单个时间段的核查项异常分布柱状图"""
+    # 按省市分组统计
+    stats = (
+        abnormal_df.groupby([group_col, check_col], observed=True)
+        .size()
+        .reset_index(name="数量")
+    )
+
+    categories = abnormal_df[check_col].unique()
+
+    fig = go.Figure()
+    colors = px.colors.qualitative.Set3[: len(categories)]
+
+    for i, category in enumerate(categories):
+        cat_data = stats[stats[check_col] == category]
+        if len(cat_data) > 0:
+            fig.add_trace(
+                go.Bar(
+                    name=category,
+                    x=cat_data[group_col],
+                    y=cat_data["数量"],
+                    text=cat_data["数量"],
+                    textposition="auto",
+                    marker_color=colors[i],
+                )
             )
 
-            # 筛选两个时间段的异常数据
-            abnormal_df1 = filtered_df[filtered_df[check_col] != "正常"].copy()
-            abnormal_df2 = filtered_df2[filtered_df2[check_col] != "正常"].copy()
-
-            # 创建双列布局显示两个时间段
-            col1, col2 = st.columns(2)
-
-            with col1:
-                st.markdown(f"#### 时间段1")
-                if not abnormal_df1.empty:
-                    # 按省市分组统计
-                    stats1 = (
-                        abnormal_df1.groupby([group_col, check_col])
-                        .size()
-                        .reset_index(name="数量")
-                    )
+    fig.update_layout(
+        title=f"{chart_title}异常分布",
+        xaxis_title=group_col,
+        yaxis_title="异常数量",
+        barmode="group",
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        xaxis_tickangle=-45,
+        height=350,
+    )
+    return fig
 
-                    categories1 = abnormal_df1[check_col].unique()
-
-                    fig1 = go.Figure()
-                    colors = px.colors.qualitative.Set3[: len(categories1)]
-
-                    for i, category in enumerate(categories1):
-                        cat_data = stats1[stats1[check_col] == category]
-                        if len(cat_data) > 0:
-                            fig1.add_trace(
-                                go.Bar(
-                                    name=category,
-                                    x=cat_data[group_col],
-                                    y=cat_data["数量"],
-                                    text=cat_data["数量"],
-                                    textposition="auto",
-                                    marker_color=colors[i],
-                                )
-                            )
-
-                    fig1.update_layout(
-                        title=f"{chart_title}异常分布",
-                        xaxis_title=group_col,
-                        yaxis_title="异常数量",
-                        barmode="group",
-                        plot_bgcolor="white",
-                        paper_bgcolor="white",
-                        xaxis_tickangle=-45,
-                        height=350,
-                    )
-                    st.plotly_chart(
-                        fig1,
-                        use_container_width=True,
-                        key=f"period1_{check_col}_{group_col}",
-                    )
 
-            with col2:
-                st.markdown(f"#### 时间段2")
-                if not abnormal_df2.empty:
-                    # 按省市分组统计
-                    stats2 = (
-                        abnormal_df2.groupby([group_col, check_col])
-                        .size()
-                        .reset_index(name="数量")
-                    )
+def build_check_comparison(
+    filtered_df, filtered_df2, check_col, group_col, chart_title, period1, period2
+):
+    """计算核查项在两个时间段的异常分布图、合并明细和汇总对比表"""
+    # 筛选两个时间段的异常数据
+    abnormal_df1 = filtered_df[get_abnormal_mask(filtered_df, [check_col])]
+    abnormal_df2 = filtered_df2[get_abnormal_mask(filtered_df2, [check_col])]
+
+    fig1 = (
+        create_period_check_chart(abnormal_df1, check_col, group_col, chart_title)
+        if not abnormal_df1.empty
+        else None
+    )
+    fig2 = (
+        create_period_check_chart(abnormal_df2, check_col, group_col, chart_title)
+        if not abnormal_df2.empty
+        else None
+    )
 
-                    categories2 = abnormal_df2[check_col].unique()
-
-                    fig2 = go.Figure()
-                    colors = px.colors.qualitative.Set3[: len(categories2)]
-
-                    for i, category in enumerate(categories2):
-                        cat_data = stats2[stats2[check_col] == category]
-                        if len(cat_data) > 0:
-                            fig2.add_trace(
-                                go.Bar(
-                                    name=category,
-                                    x=cat_data[group_col],
-                                    y=cat_data["数量"],
-                                    text=cat_data["数量"],
-                                    textposition="auto",
-                                    marker_color=colors[i],
-                                )
-                            )
-
-                    fig2.update_layout(
-                        title=f"{chart_title}异常分布",
-                        xaxis_title=group_col,
-                        yaxis_title="异常数量",
-                        barmode="group",
-                        plot_bgcolor="white",
-                        paper_bgcolor="white",
-                        xaxis_tickangle=-45,
-                        height=350,
-                    )
-                    st.plotly_chart(
-                        fig2,
-                        use_container_width=True,
-                        key=f"period2_{check_col}_{group_col}",
-                    )
-                else:
-                    st.info("该时间段无异常记录")
+    # 合并时间段1和时间段2的数据
+    combined_abnormal_df = pd.concat(
+        [
+            abnormal_df1.assign(时间段=period1),
+            abnormal_df2.assign(时间段=period2),
+        ]
+    )
+    combined_abnormal_df = combined_abnormal_df.sort_index()
 
-            # 合并时间段1和时间段2的数据
-            abnormal_df1["时间段"] = f"{start_date1} 至 {end_date1}"
-            abnormal_df2["时间段"] = f"{start_date2} 至 {end_date2}"
-            combined_abnormal_df = pd.concat([abnormal_df1, abnormal_df2])
+    # 按地区汇总两个时间段的异常数
+    period1_by_region = (
+        abnormal_df1.groupby(group_col).size().reset_index(name="时间段1异常数")
+    )
+    period2_by_region = (
+        abnormal_df2.groupby(group_col).size().reset_index(name="时间段2异常数")
+    )
+    summary_df = pd.merge(
+        period1_by_region, period2_by_region, on=group_col, how="outer"
+    ).fillna(0)
+    summary_df["时间段1异常数"] = summary_df["时间段1异常数"].astype(int)
+    summary_df["时间段2异常数"] = summary_df["时间段2异常数"].astype(int)
 
-            with st.expander(f"{chart_title}异常详细数据 (合并显示)"):
-                st.dataframe(combined_abnormal_df.sort_index(), hide_index=True)
+    return fig1, fig2, combined_abnormal_df, summary_df
 
-            # 添加汇总对比表
-            st.markdown("#### 📊 汇总对比")
-            summary_data = []
 
-            # 时间段1汇总
-            if selected_city != "全部":
-                period1_by_region = (
-                    abnormal_df1.groupby("市").size().reset_index(name="时间段1异常数")
-                )
-            elif selected_province != "全部":
-                period1_by_region = (
-                    abnormal_df1.groupby("市").size().reset_index(name="时间段1异常数")
-                )
-            else:
-                period1_by_region = (
-                    abnormal_df1.groupby("省").size().reset_index(name="时间段1异常数")
-                )
+def build_check_single(
+    filtered_df,
+    check_col,
+    group_col,
+    chart_title,
+    selected_province,
+    selected_city,
+    period1,
+):
+    """计算核查项在时间段1的异常分布图和明细，无异常时图表为None"""
+    # 筛选异常数据
+    abnormal_df = filtered_df[get_abnormal_mask(filtered_df, [check_col])]
+    if abnormal_df.empty:
+        return None, abnormal_df
 
-            # 时间段2汇总
-            if selected_city != "全部":
-                period2_by_region = (
-                    abnormal_df2.groupby("市").size().reset_index(name="时间段2异常数")
-                )
-            elif selected_province != "全部":
-                period2_by_region = (
-                    abnormal_df2.groupby("市").size().reset_index(name="时间段2异常数")
-                )
-            else:
-                period2_by_region = (
-                    abnormal_df2.groupby("省").size().reset_index(name="时间段2异常数")
-                )
+    # 获取所有异常类别
+    categories = abnormal_df[check_col].unique()
 
-            # 合并汇总
-            if selected_city != "全部":
-                region_col = "市"
-            elif selected_province != "全部":
-                region_col = "市"
-            else:
-                region_col = "省"
+    # 如果类别太多，可以合并其他类别
+    if len(categories) > 10:
+        main_categories = categories[:8]
+        other_df = abnormal_df[~abnormal_df[check_col].isin(main_categories)]
+        if len(other_df) > 0:
+            other_df = other_df.assign(**{check_col: "其他"})
+            abnormal_df = pd.concat(
+                [
+                    abnormal_df[abnormal_df[check_col].isin(main_categories)],
+                    other_df,
+                ]
+            )
 
-            summary_df = pd.merge(
-                period1_by_region.rename(columns={region_col: region_col}),
-                period2_by_region.rename(columns={region_col: region_col}),
-                on=region_col,
-                how="outer",
-            ).fillna(0)
-            summary_df["时间段1异常数"] = summary_df["时间段1异常数"].astype(int)
-            summary_df["时间段2异常数"] = summary_df["时间段2异常数"].astype(int)
+    # 使用函数创建图表
+    fig = create_category_bar_chart(
+        abnormal_df,
+        check_col,
+        group_col,
+        chart_title,
+        selected_province,
+        selected_city,
+        period1,
+    )
 
-            st.dataframe(summary_df, use_container_width=True)
+    default_columns = [
+        "日期",
+        "车牌号码",
+        "驾驶员名称",
+        "路桥费",
+        "停车费",
+        "加班费",
+        "开始时间",
+        "结束时间",
+        "行驶里程",
+        "开始公里数",
+        "结束公里数",
+        "小计",
+        "上传人姓名",
+        "供应商名称",
+        "省",
+        "市",
+        "一级项目名称",
+        "二级项目名称",
+        "工作时长",
+        "工作时长核查",
+        "公里数核查",
+        "路桥费核查",
+        "加班费核查",
+    ]
+    return fig, abnormal_df[default_columns]
+
+
+@st.fragment
+def render_check_anomaly_section(
+    check_col,
+    filtered_df,
+    filtered_df2,
+    group_col,
+    selected_province,
+    selected_city,
+    period1,
+    period2,
+):
+    """渲染单个核查项的异常分析区块，filtered_df2不为None时按时间段对比
+
+    每个核查项是独立的fragment：翻页、搜索等区块内的操作只重新运行本区块；
+    外层筛选条件变化时随外层fragment一起按新的参数重新运行。
+    """
+    chart_title = check_col.replace("核查", "")
+
+    # 创建子标题
+    st.markdown(f"### 📊 {chart_title}异常分析")
+
+    if filtered_df2 is not None:
+        # ========== 时间段对比模式 ==========
+        st.markdown(f"**时间段1 ({period1}) vs 时间段2 ({period2})**")
+
+        fig1, fig2, combined_abnormal_df, summary_df = memoize_section(
+            f"check_{check_col}",
+            (filtered_df, filtered_df2, group_col, period1, period2),
+            lambda: build_check_comparison(
+                filtered_df,
+                filtered_df2,
+                check_col,
+                group_col,
+                chart_title,
+                period1,
+                period2,
+            ),
+        )
 
-        else:
-            # ========== 单时间段模式 ==========
-            # 筛选异常数据
-            abnormal_df = filtered_df[filtered_df[check_col] != "正常"].copy()
+        # 创建双列布局显示两个时间段
+        col1, col2 = st.columns(2)
 
-            if abnormal_df.empty:
-                st.write(f"✅ 当前筛选条件下没有{chart_title}异常记录")
-                st.divider()
-                continue
+        with col1:
+            st.markdown(f"#### 时间段1")
+            if fig1 is not None:
+                st.plotly_chart(
+                    fig1,
+                    use_container_width=True,
+                    key=f"period1_{check_col}_{group_col}",
+                )
 
-            # 按省份和异常类别分组统计
-            category_stats = (
-                abnormal_df.groupby([group_col, check_col])
-                .size()
-                .reset_index(name="数量")
-            )
+        with col2:
+            st.markdown(f"#### 时间段2")
+            if fig2 is not None:
+                st.plotly_chart(
+                    fig2,
+                    use_container_width=True,
+                    key=f"period2_{check_col}_{group_col}",
+                )
+            else:
+                st.info("该时间段无异常记录")
 
-            # 获取所有异常类别
-            categories = abnormal_df[check_col].unique()
+        with st.expander(f"{chart_title}异常详细数据 (合并显示)"):
+            TableComponents.display_paginated_dataframe(
+                combined_abnormal_df, key=f"{check_col}_combined", hide_index=True
+            )
 
-            # 如果类别太多，可以合并其他类别
-            if len(categories) > 10:
-                main_categories = categories[:8]
-                other_df = abnormal_df[~abnormal_df[check_col].isin(main_categories)]
-                if len(other_df) > 0:
-                    categories = list(main_categories) + ["其他"]
-                    other_df = other_df.copy()
-                    other_df[check_col] = "其他"
-                    abnormal_df = pd.concat(
-                        [
-                            abnormal_df[abnormal_df[check_col].isin(main_categories)],
-                            other_df,
-                        ]
-                    )
-                    category_stats = (
-                        abnormal_df.groupby([group_col, check_col])
-                        .size()
-                        .reset_index(name="数量")
-                    )
+        # 添加汇总对比表
+        st.markdown("#### 📊 汇总对比")
+        st.dataframe(summary_df, use_container_width=True)
 
-            # 使用函数创建图表
-            fig = create_category_bar_chart(
-                abnormal_df,
+    else:
+        # ========== 单时间段模式 ==========
+        fig, detail_df = memoize_section(
+            f"check_{check_col}",
+            (filtered_df, group_col, selected_province, selected_city, period1),
+            lambda: build_check_single(
+                filtered_df,
                 check_col,
                 group_col,
                 chart_title,
                 selected_province,
                 selected_city,
-                f"{start_date1} 至 {end_date1}",
-            )
+                period1,
+            ),
+        )
 
+        if fig is None:
+            st.write(f"✅ 当前筛选条件下没有{chart_title}异常记录")
+        else:
             # 显示图表
             st.plotly_chart(fig, use_container_width=True)
-            default_columns = [
-                "日期",
-                "车牌号码",
-                "驾驶员名称",
-                "路桥费",
-                "停车费",
-                "加班费",
-                "开始时间",
-                "结束时间",
-                "行驶里程",
-                "开始公里数",
-                "结束公里数",
-                "小计",
-                "上传人姓名",
-                "供应商名称",
-                "省",
-                "市",
-                "一级项目名称",
-                "二级项目名称",
-                "工作时长",
-                "工作时长核查",
-                "公里数核查",
-                "路桥费核查",
-                "加班费核查",
-            ]
+
             # 显示详细数据表格
             with st.expander(f"📋 查看{chart_title}异常详细数据"):
-                st.dataframe(abnormal_df[default_columns], hide_index=True)
-
-        st.divider()
+                TableComponents.display_paginated_dataframe(
+                    detail_df, key=f"{check_col}_detail", hide_index=True
+                )
 
+    st.divider()
 
 # 创建筛选项
 def create_filters():
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.identity_registry import IdentityRegistry
+
+
+def test_overlay_shares_base_codes_without_growing_base():
+    base = IdentityRegistry()
+    base_codes = base.encode(pd.Series([" a", "b", None]))
+
+    overlay = IdentityRegistry(base)
+    codes = overlay.encode(pd.Series(["b", "c ", "a", np.nan]))
+
+    assert list(codes) == [base_codes[1], 2, base_codes[0], IdentityRegistry.MISSING]
+    assert list(overlay.decode(codes)[:3]) == ["b", "c", "a"]
+    assert len(base) == 2 and len(overlay) == 3
+
+
+def test_base_is_read_only_once_overlaid():
+    base = IdentityRegistry()
+    base.encode(["a"])
+    IdentityRegistry(base)
+
+    assert list(base.encode(["a"])) == [0]
+    with pytest.raises(ValueError):
+        base.encode(["new"])
@@ -0,0 +1,33 @@
+import pytest
+
+from benchmarks.data_generator import generate_datasets, write_workbooks
+from core.excel_cache import excel_parse_cache
+from core.result_cache import shared_result_cache
+from core.task_data_processor import run_task_pipeline
+from core.vehicle_data_processor import DataChecker
+
+
+@pytest.fixture
+def workbooks(tmp_path, monkeypatch):
+    """写出带额外出勤列的测试数据（不使用解析缓存和结果缓存）"""
+    monkeypatch.setattr(excel_parse_cache, "enabled", False)
+    monkeypatch.setattr(shared_result_cache, "enabled", False)
+    datasets = generate_datasets(300, seed=3)
+    datasets["vehicle"]["额外备注列"] = "x"
+    return write_workbooks(datasets, str(tmp_path))
+
+
+def test_extra_attendance_column_survives_into_final_df(workbooks):
+    final_df, _ = run_task_pipeline(
+        workbooks["personnel"],
+        workbooks["employee"],
+        workbooks["vehicle"],
+        workbooks["task"],
+    )
+    assert "额外备注列" in final_df.columns
+    assert (final_df["额外备注列"] == "x").all()
+
+
+def test_extra_attendance_column_survives_checker_load(workbooks):
+    df = DataChecker().load_data(workbooks["vehicle"])
+    assert "额外备注列" in df.columns
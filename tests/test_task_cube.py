@@ -0,0 +1,28 @@
+import pandas as pd
+
+from core.data_services import DataProcessingService, TaskCubeService
+
+
+def _task_frame():
+    return pd.DataFrame(
+        {
+            "省": ["甲", "甲", "乙", "乙", "甲"],
+            "市": ["B", "A", "C", "A", "D"],
+            "上传人姓名": ["u1", "u2", "u3", "u4", "u5"],
+            "日期": pd.to_datetime(
+                ["2024-01-03", "2024-01-01", "2024-01-02", "2024-01-01", "2024-01-02"]
+            ),
+            "待执行": [1, 0, 2, 0, 1],
+            "完成": [1, 2, 0, 1, 3],
+            "通过": [0, 1, 1, 0, 0],
+            "未知": [0, 0, 0, 0, 0],
+        }
+    )
+
+
+def test_city_trends_keep_first_appearing_cities():
+    cube = TaskCubeService.build_cube(_task_frame())
+
+    assert list(TaskCubeService.first_appearance(cube, "市")) == ["B", "A", "C", "D"]
+    trends = DataProcessingService.calculate_city_trends(cube, max_cities=2)
+    assert set(trends["市"]) == {"A", "B"}
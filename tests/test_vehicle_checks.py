@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks.data_generator import generate_datasets
+from core.vehicle_data_processor import (
+    CHECK_DEPENDENCIES,
+    DataChecker,
+    get_abnormal_mask,
+)
+
+CHECK_COLUMNS = [column for _, column in CHECK_DEPENDENCIES.values()]
+
+
+def _checked_frame(seed=5):
+    vehicle_df = generate_datasets(2000, seed=seed)["vehicle"]
+    return DataChecker().perform_all_checks(vehicle_df)
+
+
+def _changed_config(checker):
+    return {
+        "mileage": {"min_mileage": 60, "max_mileage": 250},
+        "work_time": {**checker.config["work_time"], "min_hours": 6},
+    }
+
+
+def test_checked_frame_has_no_internal_columns():
+    checked = _checked_frame()
+    assert "异常标志" not in checked.columns
+    assert list(checked.columns[-2:]) == ["核查摘要", "异常数量"]
+
+
+def test_abnormal_mask_matches_labels():
+    checked = _checked_frame()
+    for column in CHECK_COLUMNS:
+        expected = (checked[column].astype(str) != "正常").to_numpy()
+        assert np.array_equal(get_abnormal_mask(checked, [column]), expected)
+
+    subset = checked[checked.index % 3 == 0]
+    assert np.array_equal(
+        get_abnormal_mask(subset), (subset["异常数量"] > 0).to_numpy()
+    )
+
+
+def test_recheck_of_another_frame_of_equal_length():
+    checker = DataChecker()
+    first = checker.perform_all_checks(generate_datasets(2000, seed=5)["vehicle"])
+    second = _checked_frame(seed=6)
+    assert len(first) == len(second)
+
+    config = _changed_config(checker)
+    rechecked = checker.recheck(second, config)
+    expected = DataChecker(config).perform_all_checks(
+        generate_datasets(2000, seed=6)["vehicle"]
+    )
+    pd.testing.assert_frame_equal(rechecked, expected)
+
+
+def test_recheck_of_shallow_copy_reuses_parsed_columns():
+    checker = DataChecker()
+    checked = checker.perform_all_checks(generate_datasets(2000, seed=5)["vehicle"])
+    parsed = dict(checker._parsed_cache)
+
+    checker.recheck(checked.copy(deep=False), _changed_config(checker))
+    assert all(checker._parsed_cache[key] is value for key, value in parsed.items())